@@ -0,0 +1,99 @@
+from collections import namedtuple
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from tree import index_by_parent
+
+PATH_SEPARATOR = "/"
+
+_Row = namedtuple("_Row", "id parent_id code")
+
+
+def compute_ancestry(rows: Iterable[Tuple[int, Optional[int], str]]) -> Dict[int, dict]:
+    """Ancestry columns for (id, parent_id, code) rows, in O(n).
+
+    function_id is the root ancestor (the element itself for functions),
+    category_id the depth-1 ancestor (None for functions), depth starts
+    at 0 and path joins the codes from the root, e.g. "ID/ID.AM/ID.AM-01".
+    Rows whose parent is not among `rows` are left out.
+    """
+    children_of = index_by_parent(_Row._make(row) for row in rows)
+    ancestry = {}
+    stack = [(element, None) for element in children_of.get(None, ())]
+    while stack:
+        element, parent = stack.pop()
+        if parent is None:
+            values = {
+                "function_id": element.id,
+                "category_id": None,
+                "depth": 0,
+                "path": element.code,
+            }
+        else:
+            values = {
+                "function_id": parent["function_id"],
+                "category_id": parent["category_id"] if parent["depth"] else element.id,
+                "depth": parent["depth"] + 1,
+                "path": f"{parent['path']}{PATH_SEPARATOR}{element.code}",
+            }
+        ancestry[element.id] = values
+        stack.extend((child, values) for child in children_of.get(element.id, ()))
+    return ancestry
+
+
+def materialize_ancestry(db: Session, element_model: Any, framework: Optional[str] = None) -> int:
+    """Recompute function_id, category_id, depth and path for a catalog.
+
+    Call after inserting or re-parenting elements, in the same transaction.
+    Only rows whose values changed are written, with one executemany
+    UPDATE. Returns the number of rows updated.
+    """
+    columns = (
+        element_model.id, element_model.parent_id, element_model.code,
+        element_model.function_id, element_model.category_id,
+        element_model.depth, element_model.path,
+    )
+    query = select(*columns)
+    if framework is not None:
+        query = query.where(element_model.framework == framework)
+    rows = db.execute(query).all()
+
+    ancestry = compute_ancestry((row.id, row.parent_id, row.code) for row in rows)
+    changed = [
+        {"id": row.id, **ancestry[row.id]}
+        for row in rows
+        if row.id in ancestry
+        and (row.function_id, row.category_id, row.depth, row.path)
+        != tuple(ancestry[row.id].values())
+    ]
+    if changed:
+        db.execute(update(element_model), changed)
+    return len(changed)
+
+
+def ensure_ancestry(db: Session, element_model: Any):
+    """Backfill ancestry columns on databases created before they existed"""
+    missing = db.execute(
+        select(element_model.id).where(element_model.depth.is_(None)).limit(1)
+    ).first()
+    if missing is not None:
+        materialize_ancestry(db, element_model)
+        db.commit()
+
+
+def subtree_filter(element_model: Any, path: str):
+    """SQL condition matching the element at `path` and all its descendants.
+
+    Expressed as a range on `path` so it is served by the path index.
+    """
+    prefix = path.rstrip(PATH_SEPARATOR)
+    return or_(
+        element_model.path == prefix,
+        and_(
+            element_model.path >= prefix + PATH_SEPARATOR,
+            # The character right after the separator closes the range
+            element_model.path < prefix + chr(ord(PATH_SEPARATOR) + 1),
+        ),
+    )
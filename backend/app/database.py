@@ -1,23 +1,76 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.models import Base
+from config import settings
+from db_stack import ASYNC_STACK, run_with_session
+from metrics import instrument_engine
+from migrations import migrate
+from sqlite_profile import (
+    create_async_read_engine,
+    create_async_write_engine,
+    create_read_engine,
+    create_write_engine,
+)
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./grc_poc.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_write_engine(SQLALCHEMY_DATABASE_URL, settings)
+read_engine = create_read_engine(SQLALCHEMY_DATABASE_URL, settings, engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+if ASYNC_STACK:
+    async_engine = create_async_write_engine(SQLALCHEMY_DATABASE_URL, settings)
+    async_read_engine = create_async_read_engine(SQLALCHEMY_DATABASE_URL, settings, async_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine, autoflush=False, expire_on_commit=False
+    )
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    instrument_engine(read_engine)
+    if ASYNC_STACK:
+        instrument_engine(async_engine)
+        instrument_engine(async_read_engine)
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    migrate(engine, Base.metadata)
 
 
-def get_db():
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_sync_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+# Route dependencies for the configured stack
+if ASYNC_STACK:
+    get_db, get_read_db = get_async_db, get_async_read_db
+else:
+    get_db, get_read_db = get_sync_db, get_sync_read_db
@@ -1,5 +1,9 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models import FrameworkElement, SecurityAssessment, AssessmentItem
+from ancestry import materialize_ancestry
 
 
 def get_nist_csf_data():
@@ -203,24 +207,45 @@ def get_nist_csf_data():
     ]
 
 
-def insert_framework_element(db: Session, element_data: dict, parent_id: int = None):
-    """Recursively insert framework elements"""
-    children_data = element_data.pop("children", [])
-    
-    element = FrameworkElement(
-        code=element_data["code"],
-        title=element_data["title"],
-        description=element_data.get("description"),
-        level=element_data["level"],
-        parent_id=parent_id
-    )
-    db.add(element)
-    db.flush()
-    
-    for child_data in children_data:
-        insert_framework_element(db, child_data, element.id)
-    
-    return element
+def flatten_levels(elements: List[dict]) -> List[List[Tuple[dict, Optional[str]]]]:
+    """Group a nested element tree by depth as (element, parent_code) pairs"""
+    levels = []
+    current = [(element, None) for element in elements]
+    while current:
+        levels.append(current)
+        current = [
+            (child, element["code"])
+            for element, _ in current
+            for child in element.get("children", [])
+        ]
+    return levels
+
+
+def insert_framework_elements(db: Session, elements: List[dict]) -> Dict[str, Tuple[int, str]]:
+    """Insert a nested element tree with one bulk insert per level.
+
+    Returns a code -> (id, level) map for every inserted element.
+    """
+    inserted = {}
+    for level in flatten_levels(elements):
+        rows = db.execute(
+            insert(FrameworkElement).returning(
+                FrameworkElement.code, FrameworkElement.id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "code": element["code"],
+                    "title": element["title"],
+                    "description": element.get("description"),
+                    "level": element["level"],
+                    "parent_id": inserted[parent_code][0] if parent_code else None,
+                }
+                for element, parent_code in level
+            ]
+        ).all()
+        for (element, _), (code, element_id) in zip(level, rows):
+            inserted[code] = (element_id, element["level"])
+    return inserted
 
 
 def initialize_data(db: Session):
@@ -235,9 +260,8 @@ def initialize_data(db: Session):
     print("Initializing NIST CSF 2.0 data...")
     
     # Insert framework elements
-    csf_data = get_nist_csf_data()
-    for function_data in csf_data:
-        insert_framework_element(db, function_data)
+    inserted = insert_framework_elements(db, get_nist_csf_data())
+    materialize_ancestry(db, FrameworkElement)
     
     # Create default assessment
     assessment = SecurityAssessment(
@@ -247,21 +271,22 @@ def initialize_data(db: Session):
     db.add(assessment)
     db.flush()
     
-    # Create assessment items for all subcategories
-    subcategories = db.query(FrameworkElement).filter(
-        FrameworkElement.level == "subcategory"
-    ).all()
-    
-    for subcategory in subcategories:
-        item = AssessmentItem(
-            assessment_id=assessment.id,
-            framework_element_id=subcategory.id,
-            current_maturity=0,
-            target_maturity=3,
-            notes="",
-            evidence_links=""
-        )
-        db.add(item)
+    # Create assessment items for all subcategories from the ids in memory
+    subcategory_ids = [
+        element_id for element_id, level in inserted.values() if level == "subcategory"
+    ]
+    if subcategory_ids:
+        db.execute(insert(AssessmentItem), [
+            {
+                "assessment_id": assessment.id,
+                "framework_element_id": subcategory_id,
+                "current_maturity": 0,
+                "target_maturity": 3,
+                "notes": "",
+                "evidence_links": ""
+            }
+            for subcategory_id in subcategory_ids
+        ])
     
     db.commit()
-    print(f"Initialized {len(subcategories)} subcategories and 1 assessment")
+    print(f"Initialized {len(subcategory_ids)} subcategories and 1 assessment")
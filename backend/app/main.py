@@ -1,10 +1,11 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List
 import json
 
-from app.database import get_db, init_db
+from app.database import SessionLocal, get_db, get_read_db, init_db, run_with_session
 from app.models import FrameworkElement, AssessmentItem, SecurityAssessment
 from app.schemas import (
     FrameworkElementTree,
@@ -13,8 +14,14 @@ from app.schemas import (
     FunctionSummary
 )
 from app.init_data import initialize_data
+from ancestry import ensure_ancestry
+from config import settings
+from metrics import MetricsMiddleware, RequestMetrics
+from profiling import ProfilingMiddleware, profile_store, router as profiling_router
+from summary import function_rollup_query
+from tree import build_tree
 
-app = FastAPI(title="GRC POC API", version="0.1.0")
+app = FastAPI(title="GRC POC API", version="0.1.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -25,33 +32,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sample_rate=settings.profiling_sample_rate,
+        min_duration_ms=settings.profiling_min_duration_ms
+    )
+    app.include_router(profiling_router)
+
+request_metrics = RequestMetrics()
+if settings.metrics_enabled:
+    # Added last, so it is outermost and times CORS handling and profiling too
+    app.add_middleware(
+        MetricsMiddleware,
+        metrics=request_metrics,
+        timing_headers=settings.metrics_timing_headers
+    )
+
 
 @app.on_event("startup")
 def startup_event():
     init_db()
-    db = next(get_db())
+    db = SessionLocal()
     try:
         initialize_data(db)
+        ensure_ancestry(db, FrameworkElement)
     finally:
         db.close()
 
 
-def build_tree(elements: List[FrameworkElement], parent_id=None) -> List[dict]:
-    """Build hierarchical tree structure"""
-    tree = []
-    for element in elements:
-        if element.parent_id == parent_id:
-            node = {
-                "id": element.id,
-                "code": element.code,
-                "title": element.title,
-                "description": element.description,
-                "level": element.level,
-                "parent_id": element.parent_id,
-                "children": build_tree(elements, element.id)
-            }
-            tree.append(node)
-    return tree
+def serialize_element(element: FrameworkElement) -> dict:
+    """Serialize a framework element for the tree response"""
+    return {
+        "id": element.id,
+        "code": element.code,
+        "title": element.title,
+        "description": element.description,
+        "level": element.level,
+        "parent_id": element.parent_id,
+    }
 
 
 @app.get("/")
@@ -59,43 +79,58 @@ def read_root():
     return {"message": "GRC POC API v0.1"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return request_metrics.response()
+
+
 @app.get("/framework-elements", response_model=List[FrameworkElementTree])
-def get_framework_elements(db: Session = Depends(get_db)):
+@run_with_session
+def get_framework_elements(db: Session = Depends(get_read_db)):
     """Get all framework elements in tree structure"""
-    elements = db.query(FrameworkElement).all()
-    tree = build_tree(elements)
+    elements = db.query(FrameworkElement).order_by(FrameworkElement.id).all()
+    tree = build_tree(elements, serialize_element)
     return tree
 
 
 @app.get("/assessment-items", response_model=List[AssessmentItemSchema])
+@run_with_session
 def get_assessment_items(
     assessment_id: int = 1,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all assessment items for an assessment"""
-    items = db.query(AssessmentItem).filter(
+    items = db.query(AssessmentItem).options(
+        selectinload(AssessmentItem.framework_element)
+    ).filter(
         AssessmentItem.assessment_id == assessment_id
-    ).all()
+    ).order_by(AssessmentItem.id).all()
     return items
 
 
 @app.get("/assessment-items/{item_id}", response_model=AssessmentItemSchema)
-def get_assessment_item(item_id: int, db: Session = Depends(get_db)):
+@run_with_session
+def get_assessment_item(item_id: int, db: Session = Depends(get_read_db)):
     """Get a specific assessment item"""
-    item = db.query(AssessmentItem).filter(AssessmentItem.id == item_id).first()
+    item = db.query(AssessmentItem).options(
+        joinedload(AssessmentItem.framework_element)
+    ).filter(AssessmentItem.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Assessment item not found")
     return item
 
 
 @app.patch("/assessment-items/{item_id}", response_model=AssessmentItemSchema)
+@run_with_session
 def update_assessment_item(
     item_id: int,
     item_update: AssessmentItemUpdate,
     db: Session = Depends(get_db)
 ):
     """Update an assessment item"""
-    item = db.query(AssessmentItem).filter(AssessmentItem.id == item_id).first()
+    item = db.query(AssessmentItem).options(
+        joinedload(AssessmentItem.framework_element)
+    ).filter(AssessmentItem.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Assessment item not found")
     
@@ -109,66 +144,29 @@ def update_assessment_item(
 
 
 @app.get("/assessment-summary", response_model=List[FunctionSummary])
+@run_with_session
 def get_assessment_summary(
     assessment_id: int = 1,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get summary statistics by function"""
-    
-    # Get all functions
-    functions = db.query(FrameworkElement).filter(
-        FrameworkElement.level == "function"
+    rows = db.execute(
+        function_rollup_query(FrameworkElement, AssessmentItem, assessment_id)
     ).all()
     
-    summaries = []
-    
-    for function in functions:
-        # Get all subcategories under this function
-        subcategories = []
-        categories = db.query(FrameworkElement).filter(
-            FrameworkElement.parent_id == function.id,
-            FrameworkElement.level == "category"
-        ).all()
-        
-        for category in categories:
-            subs = db.query(FrameworkElement).filter(
-                FrameworkElement.parent_id == category.id,
-                FrameworkElement.level == "subcategory"
-            ).all()
-            subcategories.extend(subs)
-        
-        if not subcategories:
-            continue
-        
-        # Get assessment items for these subcategories
-        subcategory_ids = [s.id for s in subcategories]
-        items = db.query(AssessmentItem).filter(
-            AssessmentItem.assessment_id == assessment_id,
-            AssessmentItem.framework_element_id.in_(subcategory_ids)
-        ).all()
-        
-        if not items:
-            continue
-        
-        # Calculate averages
-        total_current = sum(item.current_maturity for item in items)
-        total_target = sum(item.target_maturity for item in items)
-        avg_current = total_current / len(items) if items else 0
-        avg_target = total_target / len(items) if items else 0
-        
-        # Count completed (current_maturity > 0)
-        completed = sum(1 for item in items if item.current_maturity > 0)
-        
-        summaries.append(FunctionSummary(
-            function_code=function.code,
-            function_title=function.title,
-            avg_current=round(avg_current, 2),
-            avg_target=round(avg_target, 2),
-            total_subcategories=len(items),
-            completed_subcategories=completed
-        ))
-    
-    return summaries
+    # Functions without assessed subcategories are left out
+    return [
+        FunctionSummary(
+            function_code=row.function_code,
+            function_title=row.function_title,
+            avg_current=round(row.avg_current, 2),
+            avg_target=round(row.avg_target, 2),
+            total_subcategories=row.item_count,
+            completed_subcategories=row.completed
+        )
+        for row in rows
+        if row.item_count
+    ]
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -6,15 +6,26 @@ Base = declarative_base()
 
 class FrameworkElement(Base):
     __tablename__ = "framework_elements"
+    __table_args__ = (
+        Index("ix_framework_elements_function_level", "function_id", "level"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(50), unique=True, index=True, nullable=False)
     title = Column(String(500), nullable=False)
     description = Column(Text)
-    level = Column(String(20), nullable=False)  # function, category, subcategory
-    parent_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True)
-
-    parent = relationship("FrameworkElement", remote_side=[id], backref="children")
+    level = Column(String(20), nullable=False, index=True)  # function, category, subcategory
+    parent_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True, index=True)
+
+    # Materialized ancestry, maintained by ancestry.materialize_ancestry
+    function_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True, index=True)
+    depth = Column(Integer, nullable=True)  # 0 for functions
+    path = Column(String(500), nullable=True, index=True)  # e.g., "ID/ID.AM/ID.AM-01"
+
+    parent = relationship(
+        "FrameworkElement", remote_side=[id], foreign_keys=[parent_id], backref="children"
+    )
     assessment_items = relationship("AssessmentItem", back_populates="framework_element")
 
 
@@ -30,10 +41,19 @@ class SecurityAssessment(Base):
 
 class AssessmentItem(Base):
     __tablename__ = "assessment_items"
+    __table_args__ = (
+        Index(
+            "uq_assessment_items_assessment_element",
+            "assessment_id", "framework_element_id",
+            unique=True
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assessment_id = Column(Integer, ForeignKey("security_assessments.id"), nullable=False)
-    framework_element_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=False)
+    framework_element_id = Column(
+        Integer, ForeignKey("framework_elements.id"), nullable=False, index=True
+    )
     current_maturity = Column(Integer, default=0)  # 0-5
     target_maturity = Column(Integer, default=0)  # 0-5
     notes = Column(Text)
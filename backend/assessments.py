@@ -0,0 +1,80 @@
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.orm import Session
+import models
+
+# Columns copied when an assessment is cloned
+CLONED_ITEM_COLUMNS = ("framework_element_id", "current_maturity", "target_maturity", "notes", "evidence_links")
+ROLLUP_COLUMNS = ("element_id", "sum_current", "sum_target", "item_count", "completed_count")
+
+# Values of an item added to an assessment by seeding, creation or import
+DEFAULT_ITEM_VALUES = {
+    "current_maturity": 0,
+    "target_maturity": 3,
+    "notes": "",
+    "evidence_links": [],
+}
+
+
+def get_assessment_revision(db: Session, assessment_id: int) -> int:
+    """Current revision of an assessment (0 if it does not exist)"""
+    revision = db.execute(
+        select(models.SecurityAssessment.revision).where(
+            models.SecurityAssessment.id == assessment_id
+        )
+    ).scalar()
+    return revision or 0
+
+
+def bump_assessment_revision(db: Session, assessment_id: int):
+    """Increment an assessment's revision; call in the same transaction as the change"""
+    db.execute(
+        update(models.SecurityAssessment)
+        .where(models.SecurityAssessment.id == assessment_id)
+        .values(revision=models.SecurityAssessment.revision + 1)
+    )
+
+
+def populate_assessment(db: Session, assessment_id: int, framework: str) -> int:
+    """Add a default item per current subcategory of `framework` with one INSERT ... SELECT.
+
+    Rollups start empty and must be rebuilt for the assessment afterwards.
+    """
+    element = models.FrameworkElement
+    result = db.execute(
+        insert(models.AssessmentItem).from_select(
+            ["assessment_id", "framework_element_id", "current_maturity", "target_maturity"],
+            select(
+                literal(assessment_id), element.id,
+                literal(DEFAULT_ITEM_VALUES["current_maturity"]),
+                literal(DEFAULT_ITEM_VALUES["target_maturity"])
+            ).where(
+                element.framework == framework,
+                element.level == "subcategory",
+                element.retired.is_(False)
+            ).order_by(element.id)
+        )
+    )
+    return result.rowcount
+
+
+def copy_assessment_items(db: Session, source_id: int, target_id: int) -> int:
+    """Copy every item and rollup row of one assessment into another, inside the database"""
+    item = models.AssessmentItem
+    result = db.execute(
+        insert(item).from_select(
+            ["assessment_id", *CLONED_ITEM_COLUMNS],
+            select(literal(target_id), *(getattr(item, column) for column in CLONED_ITEM_COLUMNS))
+            .where(item.assessment_id == source_id)
+            .order_by(item.id)
+        )
+    )
+    # The copy has exactly the source's items, so it has the same rollups
+    rollup = models.MaturityRollup
+    db.execute(
+        insert(rollup).from_select(
+            ["assessment_id", *ROLLUP_COLUMNS],
+            select(literal(target_id), *(getattr(rollup, column) for column in ROLLUP_COLUMNS))
+            .where(rollup.assessment_id == source_id)
+        )
+    )
+    return result.rowcount
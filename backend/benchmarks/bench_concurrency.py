@@ -0,0 +1,94 @@
+"""Parallel writers and readers against the flat app on a temporary database.
+
+Writers PATCH random assessment items while readers fetch /summary and
+/assessment-items. Any 5xx ("database is locked") is counted as an error.
+Run from the backend directory:
+    python -m benchmarks.bench_concurrency [--writers 8] [--readers 16] [--requests 50]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_database(tmp: str):
+    """Point the flat app at a fresh seeded database in `tmp`"""
+    for name in ("seed_data.json", "privacy_framework.json"):
+        shutil.copy(os.path.join(BACKEND_DIR, name), tmp)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'grc.db')}"
+    os.chdir(tmp)
+    import seed_db
+    seed_db.load_seed_data(quiet=True)
+
+
+def run(writers: int, readers: int, requests: int):
+    from fastapi.testclient import TestClient
+    import main
+
+    item_ids = [item["id"] for item in TestClient(main.app).get("/assessment-items").json()]
+    errors = []
+    latencies = {"write": [], "read": []}
+    lock = threading.Lock()
+
+    def worker(kind: str):
+        client = TestClient(main.app, raise_server_exceptions=False)
+        for _ in range(requests):
+            start = time.perf_counter()
+            if kind == "write":
+                response = client.patch(
+                    f"/assessment-items/{random.choice(item_ids)}",
+                    json={"current_maturity": random.randint(0, 5)}
+                )
+            else:
+                response = client.get(random.choice(["/summary", "/assessment-items"]))
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[kind].append(elapsed)
+                if response.status_code >= 500:
+                    errors.append((kind, response.status_code, response.text[:200]))
+
+    threads = [threading.Thread(target=worker, args=("write",)) for _ in range(writers)]
+    threads += [threading.Thread(target=worker, args=("read",)) for _ in range(readers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{writers} writers, {readers} readers, {total} requests in {wall:.2f} s "
+          f"({total / wall:.0f} req/s)")
+    for kind, values in latencies.items():
+        if values:
+            values.sort()
+            print(f"  {kind:<5} p50 {values[len(values) // 2] * 1000:7.1f} ms   "
+                  f"p99 {values[int(len(values) * 0.99)] * 1000:7.1f} ms")
+    print(f"  errors: {len(errors)}")
+    for error in errors[:5]:
+        print(f"    {error}")
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare_database(tmp)
+        ok = run(args.writers, args.readers, args.requests)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
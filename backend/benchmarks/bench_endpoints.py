@@ -0,0 +1,268 @@
+"""Load-test both apps' endpoints on a synthetic database and compare with a baseline.
+
+Generates a synthetic catalog and assessments (benchmarks.synthetic) once,
+then, for each DB stack in its own process, drives the flat app
+(main:app) and the app package (app.main:app) in-process through httpx's
+ASGI transport. Every endpoint gets the same number of requests at a
+fixed concurrency. Throughput and p50/p95/p99 latency per endpoint are
+written as JSON. If a baseline file exists, results are compared with it
+and the exit status is 1 when an endpoint's p95 or throughput regressed
+by more than the tolerance. Run from the backend directory:
+    python -m benchmarks.bench_endpoints [--scale small|medium|large] [--concurrency 16]
+        [--requests 200] [--stacks sync,async] [--apps flat,package]
+        [--output bench_results.json] [--baseline benchmarks/baseline.json]
+        [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from benchmarks.bench_concurrency import BACKEND_DIR
+from benchmarks.bench_stacks import percentile
+from benchmarks.synthetic import (
+    FLAT_DATABASE,
+    PACKAGE_DATABASE,
+    generate,
+    load_manifest,
+    scale_arguments,
+    scale_from_arguments,
+)
+
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "baseline.json")
+
+# Requests per endpoint before measuring, to fill caches and pools
+WARMUP_REQUESTS = 10
+
+# Assessments compared by the compare endpoint
+COMPARED_ASSESSMENTS = 10
+
+
+class Endpoint(NamedTuple):
+    method: str
+    # Formatted per request with item_id, assessment_id, assessment_ids, word, framework
+    path: str
+    body: bool = False  # PATCH a random maturity
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+ENDPOINTS = {
+    "flat": [
+        Endpoint("GET", "/framework-elements?framework={framework}"),
+        Endpoint("GET", "/framework-elements/flat"),
+        Endpoint("GET", "/assessment-items?assessment_id={assessment_id}"),
+        Endpoint("GET", "/assessment-items?assessment_id={assessment_id}&limit=100"),
+        Endpoint("GET", "/assessment-items/{item_id}"),
+        Endpoint("GET", "/summary?assessment_id={assessment_id}"),
+        Endpoint("GET", "/assessments/compare?ids={assessment_ids}"),
+        Endpoint("GET", "/search?q={word}"),
+        Endpoint("PATCH", "/assessment-items/{item_id}", body=True),
+    ],
+    "package": [
+        Endpoint("GET", "/framework-elements"),
+        Endpoint("GET", "/assessment-items?assessment_id={assessment_id}"),
+        Endpoint("GET", "/assessment-items/{item_id}"),
+        Endpoint("GET", "/assessment-summary?assessment_id={assessment_id}"),
+        Endpoint("PATCH", "/assessment-items/{item_id}", body=True),
+    ],
+}
+
+
+def request_path(endpoint: Endpoint, manifest: dict, rng: random.Random) -> str:
+    return endpoint.path.format(
+        item_id=rng.randint(1, manifest["items"]),
+        assessment_id=rng.randint(1, manifest["assessments"]),
+        assessment_ids=",".join(
+            str(i) for i in range(1, min(COMPARED_ASSESSMENTS, manifest["assessments"]) + 1)
+        ),
+        word=rng.choice(manifest["vocabulary"]),
+        framework=manifest["framework"],
+    )
+
+
+async def measure(client, endpoint: Endpoint, manifest: dict, requests: int,
+                  concurrency: int, rng: random.Random) -> dict:
+    """Issue `requests` requests from `concurrency` concurrent clients"""
+    issued = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def run_client():
+        nonlocal errors
+        while next(issued) < requests:
+            kwargs = {}
+            if endpoint.body:
+                kwargs["json"] = {"current_maturity": rng.randint(0, 5)}
+            path = request_path(endpoint, manifest, rng)
+            start = time.perf_counter()
+            response = await client.request(endpoint.method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def drive(app, endpoints: List[Endpoint], manifest: dict, requests: int,
+                concurrency: int, seed: int) -> Dict[str, dict]:
+    import httpx
+
+    rng = random.Random(seed)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    # The transport does not run lifespan events; the app package loads data on startup
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for endpoint in endpoints:
+                await measure(client, endpoint, manifest, WARMUP_REQUESTS, 1, rng)
+                results[endpoint.name] = await measure(
+                    client, endpoint, manifest, requests, concurrency, rng
+                )
+    return results
+
+
+def run_child(data_dir: str, apps: List[str], requests: int, concurrency: int, seed: int):
+    """Benchmark the requested apps on a private copy of the generated databases"""
+    manifest = load_manifest(data_dir)
+    sys.path.insert(0, BACKEND_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in (FLAT_DATABASE, PACKAGE_DATABASE):
+            shutil.copy(os.path.join(data_dir, name), tmp)
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, FLAT_DATABASE)}"
+        # The app package opens ./grc_poc.db
+        os.chdir(tmp)
+        results = {}
+        for app_name in apps:
+            if app_name == "flat":
+                import main as module
+            else:
+                import app.main as module
+            results[app_name] = asyncio.run(
+                drive(module.app, ENDPOINTS[app_name], manifest, requests, concurrency, seed)
+            )
+    print(json.dumps(results))
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Print each endpoint next to its baseline; returns the regressed keys"""
+    regressions = []
+    print(f"\n{'endpoint':<72} {'p95 ms':>9} {'base':>9} {'req/s':>8} {'base':>8}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<72} {result['p95_ms']:>9.2f} {'-':>9} {result['throughput']:>8.0f} {'-':>8}")
+            continue
+        regressed = (
+            result["p95_ms"] > base["p95_ms"] * (1 + tolerance)
+            or result["throughput"] < base["throughput"] * (1 - tolerance)
+        )
+        if regressed:
+            regressions.append(key)
+        print(f"{key:<72} {result['p95_ms']:>9.2f} {base['p95_ms']:>9.2f} "
+              f"{result['throughput']:>8.0f} {base['throughput']:>8.0f}"
+              f"{'  REGRESSED' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale_arguments(parser)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--stacks", default="sync,async", help="comma-separated DB stacks")
+    parser.add_argument("--apps", default="flat,package", help="comma-separated: flat, package")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative p95 increase or throughput drop")
+    parser.add_argument("--child", metavar="DATA_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    scale = scale_from_arguments(args)
+    apps = args.apps.split(",")
+    if args.child:
+        run_child(args.child, apps, args.requests, args.concurrency, scale.seed)
+        return 0
+
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        start = time.perf_counter()
+        manifest = generate(data_dir, scale)
+        print(f"Generated {manifest['elements']} elements, {manifest['assessments']} assessments, "
+              f"{manifest['items']} items in {time.perf_counter() - start:.1f} s")
+        for stack in args.stacks.split(","):
+            # The stack is chosen at import time, so each gets its own process
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_endpoints", "--child", data_dir,
+                 "--apps", args.apps, "--requests", str(args.requests),
+                 "--concurrency", str(args.concurrency), "--seed", str(scale.seed)],
+                cwd=BACKEND_DIR,
+                env={**os.environ, "DB_STACK": stack},
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            for app_name, endpoints in json.loads(output).items():
+                for name, result in endpoints.items():
+                    results[f"{app_name}/{stack} {name}"] = result
+
+    report = {
+        "meta": {
+            "scale": scale._asdict(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {args.output}")
+
+    regressions: List[str] = []
+    baseline: Optional[dict] = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["meta"]["scale"] != report["meta"]["scale"]:
+            print(f"Warning: baseline scale {baseline['meta']['scale']} differs from this run's")
+        regressions = compare(results, baseline["results"], args.tolerance)
+    else:
+        compare(results, {}, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved baseline {args.baseline}")
+    if regressions:
+        print(f"\n{len(regressions)} endpoint(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Benchmark per-item serialization cost of the assessment item list.
+
+Compares the old response path (ORM objects validated into
+AssessmentItemDetail, run through jsonable_encoder and json.dumps, as
+FastAPI does for a response_model) with the column-tuple path encoded by
+orjson. Query time is left out; only the work done per returned item is
+measured. Run from the backend directory:
+    python -m benchmarks.bench_serialization
+"""
+import json
+import time
+from typing import List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+import models
+import schemas
+from serialization import encode_nested_rows, schema_fields
+
+SIZES = [100, 1000, 10000]
+REPEATS = 5
+
+ELEMENT_FIELDS = schema_fields(schemas.FrameworkElement)
+ITEM_FIELDS = schema_fields(schemas.AssessmentItemDetail)
+
+
+def synthetic_items(size: int) -> Tuple[List[models.AssessmentItem], List[tuple]]:
+    """The same items as transient ORM objects and as selected column tuples"""
+    objects, rows = [], []
+    for i in range(1, size + 1):
+        element = models.FrameworkElement(
+            id=i, code=f"F.C-{i:05d}", title=f"Subcategory {i}",
+            description="Synthetic subcategory " * 4, level="subcategory",
+            framework="CSF", parent_id=None, function_id=1, category_id=2,
+            depth=2, path=f"F/F.C/F.C-{i:05d}",
+        )
+        item = models.AssessmentItem(
+            id=i, assessment_id=1, framework_element_id=i,
+            current_maturity=i % 6, target_maturity=3,
+            notes="Reviewed" if i % 3 else None,
+            evidence_links=["https://example.com/evidence"] if i % 5 == 0 else None,
+        )
+        item.framework_element = element
+        objects.append(item)
+        rows.append(
+            tuple(getattr(item, name) for name in ITEM_FIELDS)
+            + tuple(getattr(element, name) for name in ELEMENT_FIELDS)
+        )
+    return objects, rows
+
+
+def pydantic_path(objects) -> bytes:
+    validated = [schemas.AssessmentItemDetail.model_validate(item) for item in objects]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def column_path(rows) -> bytes:
+    return encode_nested_rows(ITEM_FIELDS, "framework_element", ELEMENT_FIELDS, rows)
+
+
+def best_of(func, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'items':>8} {'pydantic us/item':>18} {'columns us/item':>17} {'speedup':>9}")
+    for size in SIZES:
+        objects, rows = synthetic_items(size)
+        assert json.loads(pydantic_path(objects)) == json.loads(column_path(rows))
+        slow = best_of(pydantic_path, objects) / size * 1e6
+        fast = best_of(column_path, rows) / size * 1e6
+        print(f"{size:>8} {slow:>18.2f} {fast:>17.2f} {slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Compare request latency of the sync and async database stacks.
+
+Each stack runs in its own process (the stack is chosen at import time
+through the DB_STACK setting) against a freshly seeded database. Clients
+drive the flat app in-process through httpx's ASGI transport; 10% of
+requests are PATCHes. Run from the backend directory:
+    python -m benchmarks.bench_stacks [--clients 200] [--requests 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_concurrency import BACKEND_DIR, prepare_database
+
+READ_PATHS = ["/summary", "/assessment-items", "/framework-elements/flat"]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def drive(app, clients: int, requests: int) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        item_ids = [item["id"] for item in (await client.get("/assessment-items")).json()]
+        latencies = []
+        errors = 0
+
+        async def run_client():
+            nonlocal errors
+            for _ in range(requests):
+                start = time.perf_counter()
+                if random.random() < 0.1:
+                    response = await client.patch(
+                        f"/assessment-items/{random.choice(item_ids)}",
+                        json={"current_maturity": random.randint(0, 5)}
+                    )
+                else:
+                    response = await client.get(random.choice(READ_PATHS))
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 500:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_client() for _ in range(clients)))
+        wall = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+
+def run_child(clients: int, requests: int):
+    sys.path.insert(0, BACKEND_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare_database(tmp)
+        import main
+        result = asyncio.run(drive(main.app, clients, requests))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.clients, args.requests)
+        return
+
+    print(f"{args.clients} concurrent clients x {args.requests} requests")
+    print(f"{'stack':<6} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for stack in ("sync", "async"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_stacks", "--child",
+             "--clients", str(args.clients), "--requests", str(args.requests)],
+            cwd=BACKEND_DIR,
+            env={**os.environ, "DB_STACK": stack},
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        print(f"{stack:<6} {result['throughput']:>8.0f} {result['p50_ms']:>9.1f} "
+              f"{result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark app package cold start: schema creation plus initial data load.
+
+Compares the batched level-by-level loader with the old recursive
+per-node flush on synthetic nested catalogs. Run from the backend directory:
+    python -m benchmarks.bench_startup
+"""
+import os
+import tempfile
+import time
+from typing import List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.init_data import initialize_data, insert_framework_elements
+from app.models import Base, FrameworkElement
+
+SIZES = [100, 1000, 5000]
+
+
+def synthetic_catalog(size: int, fanout: int = 10) -> List[dict]:
+    """Nested function/category/subcategory dicts with roughly `size` elements"""
+    functions = []
+    count = 0
+    while count < size:
+        function = {"code": f"F{len(functions)}", "title": "Function",
+                    "level": "function", "children": []}
+        functions.append(function)
+        count += 1
+        for c in range(fanout):
+            category = {"code": f"{function['code']}.C{c}", "title": "Category",
+                        "level": "category", "children": []}
+            function["children"].append(category)
+            count += 1
+            for s in range(fanout):
+                category["children"].append({"code": f"{category['code']}-{s}",
+                                             "title": "Subcategory",
+                                             "level": "subcategory"})
+                count += 1
+    return functions
+
+
+def insert_recursive(db, element_data: dict, parent_id: int = None):
+    """The previous loader: one flush per node to learn its id"""
+    element = FrameworkElement(
+        code=element_data["code"],
+        title=element_data["title"],
+        description=element_data.get("description"),
+        level=element_data["level"],
+        parent_id=parent_id
+    )
+    db.add(element)
+    db.flush()
+    for child_data in element_data.get("children", []):
+        insert_recursive(db, child_data, element.id)
+
+
+def timed(load) -> float:
+    """Run `load(session)` against a fresh on-disk database, including create_all"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Session = sessionmaker(bind=engine)
+        start = time.perf_counter()
+        Base.metadata.create_all(bind=engine)
+        db = Session()
+        try:
+            load(db)
+            db.commit()
+        finally:
+            db.close()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+    return elapsed
+
+
+def main():
+    print(f"initialize_data (built-in CSF data): {timed(initialize_data) * 1000:.1f} ms\n")
+    print(f"{'elements':>10} {'recursive ms':>14} {'batched ms':>12}")
+    for size in SIZES:
+        catalog = synthetic_catalog(size)
+        recursive = timed(lambda db: [insert_recursive(db, f) for f in catalog])
+        batched = timed(lambda db: insert_framework_elements(db, catalog))
+        print(f"{size:>10} {recursive * 1000:>14.1f} {batched * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
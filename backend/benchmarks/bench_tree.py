@@ -0,0 +1,67 @@
+"""Benchmark framework tree assembly on synthetic catalogs.
+
+Run from the backend directory:
+    python -m benchmarks.bench_tree
+"""
+import time
+from types import SimpleNamespace
+from typing import List
+
+from tree import build_tree
+
+SIZES = [100, 1000, 5000, 10000]
+REPEATS = 5
+
+
+def synthetic_catalog(size: int, categories_per_function: int = 10,
+                      subcategories_per_category: int = 10) -> List[SimpleNamespace]:
+    """Generate a function/category/subcategory catalog of roughly `size` elements"""
+    elements = []
+    next_id = 1
+
+    def add(level, parent_id):
+        nonlocal next_id
+        element = SimpleNamespace(
+            id=next_id,
+            code=f"E{next_id}",
+            title=f"Element {next_id}",
+            description="",
+            level=level,
+            parent_id=parent_id
+        )
+        elements.append(element)
+        next_id += 1
+        return element.id
+
+    while len(elements) < size:
+        function_id = add("function", None)
+        for _ in range(categories_per_function):
+            category_id = add("category", function_id)
+            for _ in range(subcategories_per_category):
+                add("subcategory", category_id)
+    return elements[:size]
+
+
+def serialize(element) -> dict:
+    return {"id": element.id, "code": element.code, "parent_id": element.parent_id}
+
+
+def time_build(elements) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        build_tree(elements, serialize)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'elements':>10} {'total ms':>10} {'us/element':>12}")
+    for size in SIZES:
+        elements = synthetic_catalog(size)
+        elapsed = time_build(elements)
+        print(f"{size:>10} {elapsed * 1000:>10.2f} {elapsed / size * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Check that every SQL statement issued by the read endpoints uses an index.
+
+Captures the statements each endpoint runs against a seeded temporary
+database, runs EXPLAIN QUERY PLAN on them and fails if any plan does a
+full SCAN of framework_elements, assessment_items or the item history
+tables. Run from the backend directory:
+    python -m benchmarks.explain_queries
+"""
+import os
+import re
+import sys
+import tempfile
+
+from benchmarks.bench_concurrency import BACKEND_DIR, prepare_database
+
+ENDPOINTS = [
+    "/framework-elements?framework=CSF",
+    "/assessment-items?assessment_id=1",
+    "/assessment-items?assessment_id=1&limit=20&after=5",
+    "/assessment-items?assessment_id=1&code_prefix=ID.AM",
+    "/assessment-items?assessment_id=1&path=ID/ID.AM",
+    "/assessment-items/1",
+    "/summary?assessment_id=1",
+    "/summary?assessment_id=1&framework=CSF",
+    "/assessments/1/export",
+    "/assessments?limit=20&after=1",
+    "/assessments/compare?ids=1,2",
+    "/assessments/compare?ids=1,2&group_by=category&framework=CSF",
+    "/search?q=inventor&framework=CSF&assessment_id=1",
+    "/assessment-items?assessment_id=1&as_of=2100-01-01",
+    "/assessment-items?assessment_id=1&limit=20&min_maturity=1&as_of=2100-01-01",
+    "/summary?assessment_id=1&as_of=2100-01-01",
+    "/summary?assessment_id=1&as_of=2000-01-01",
+]
+
+# A full scan of these tables means a missing or unusable index
+FULL_SCAN = re.compile(
+    r"\bSCAN (framework_elements|assessment_items|assessment_item_\w+?)(_\d+)?\b(?! USING)"
+)
+
+
+def capture_statements(client, engine, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    from sqlalchemy import event
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def main():
+    sys.path.insert(0, BACKEND_DIR)
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare_database(tmp)
+        from fastapi.testclient import TestClient
+        import main as flat_app
+        from database import read_engine
+
+        client = TestClient(flat_app.app)
+        for url in ENDPOINTS:
+            print(url)
+            for statement, parameters in capture_statements(client, read_engine, url):
+                raw = read_engine.raw_connection()
+                try:
+                    plan = raw.cursor().execute(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    ).fetchall()
+                finally:
+                    raw.close()
+                details = [row[-1] for row in plan]
+                bad = [detail for detail in details if FULL_SCAN.search(detail)]
+                failures += len(bad)
+                first_line = " ".join(statement.split())[:90]
+                print(f"  {'FAIL' if bad else 'ok  '} {first_line}")
+                for detail in details:
+                    print(f"         {detail}")
+    print(f"\n{failures} full table scan(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
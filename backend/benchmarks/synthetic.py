@@ -0,0 +1,284 @@
+"""Generate synthetic catalogs and assessments at a configurable scale.
+
+One element tree is built in memory and written into a database for each
+app: grc.db for the flat app, through catalog_loader, and grc_poc.db for
+the app package, through its batched loader. Both get the same
+assessments and items. The output is deterministic for a given scale and
+seed. Leaves are "subcategory" elements and carry the items. Titles,
+descriptions and notes draw on a small vocabulary, so search queries
+have hits. Run from the backend directory:
+    python -m benchmarks.synthetic OUT_DIR [--scale medium] [--elements N] [--depth D]
+        [--assessments N] [--items N] [--seed N]
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from catalog_loader import CatalogElement
+
+SYNTHETIC_FRAMEWORK = "SYN"
+FLAT_DATABASE = "grc.db"
+PACKAGE_DATABASE = "grc_poc.db"
+MANIFEST = "manifest.json"
+
+INSERT_BATCH_SIZE = 5000
+
+VOCABULARY = (
+    "access", "asset", "audit", "backup", "baseline", "boundary", "change", "cloud",
+    "compliance", "configuration", "continuity", "control", "credential", "data",
+    "detection", "device", "encryption", "endpoint", "event", "evidence", "firewall",
+    "governance", "identity", "incident", "integrity", "inventory", "key", "logging",
+    "malware", "monitoring", "network", "patch", "permission", "policy", "privacy",
+    "recovery", "resilience", "risk", "role", "scan", "secret", "segmentation",
+    "software", "supplier", "threat", "training", "vendor", "vulnerability",
+)
+
+
+class Scale(NamedTuple):
+    elements: int
+    depth: int
+    assessments: int
+    items: Optional[int] = None  # Items per assessment; None for every leaf
+    seed: int = 1
+
+
+SCALES = {
+    "small": Scale(elements=500, depth=3, assessments=5),
+    "medium": Scale(elements=5000, depth=3, assessments=20),
+    "large": Scale(elements=50000, depth=4, assessments=50, items=5000),
+}
+
+
+def level_name(depth: int, max_depth: int) -> str:
+    if depth == max_depth - 1:
+        return "subcategory"
+    if depth == 0:
+        return "function"
+    if depth == 1:
+        return "category"
+    return f"level-{depth}"
+
+
+def fanout_for(elements: int, depth: int) -> int:
+    """Smallest fanout whose full tree of `depth` levels holds `elements` nodes"""
+    fanout = 2
+    while sum(fanout ** level for level in range(1, depth + 1)) < elements:
+        fanout += 1
+    return fanout
+
+
+def words(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, k=rng.randint(low, high)))
+
+
+def synthetic_catalog(scale: Scale, rng: random.Random) -> List[CatalogElement]:
+    """`scale.elements` elements in `scale.depth` levels, filled breadth first"""
+    fanout = fanout_for(scale.elements, scale.depth)
+    elements: List[CatalogElement] = []
+    parents: List[Optional[str]] = [None]
+    for depth in range(scale.depth):
+        level = []
+        for parent in parents:
+            for index in range(fanout):
+                if len(elements) + len(level) == scale.elements:
+                    break
+                code = f"S{index}" if parent is None else f"{parent}.{index}"
+                level.append(CatalogElement(
+                    code, words(rng, 2, 4).title(), words(rng, 8, 20),
+                    level_name(depth, scale.depth), parent
+                ))
+        elements += level
+        parents = [element.code for element in level]
+    return elements
+
+
+def nested_catalog(elements: List[CatalogElement]) -> List[dict]:
+    """The same catalog as the nested dicts the app package loads"""
+    nodes: Dict[str, dict] = {}
+    roots = []
+    for element in elements:
+        node = {
+            "code": element.code,
+            "title": element.title,
+            "description": element.description,
+            "level": element.level,
+            "children": [],
+        }
+        nodes[element.code] = node
+        if element.parent_code is None:
+            roots.append(node)
+        else:
+            nodes[element.parent_code]["children"].append(node)
+    return roots
+
+
+def synthetic_items(scale: Scale, leaf_count: int, rng: random.Random) -> List[List[dict]]:
+    """Item values per assessment, with a `leaf` index in place of the element id"""
+    per_assessment = leaf_count if scale.items is None else min(scale.items, leaf_count)
+    assessments = []
+    for _ in range(scale.assessments):
+        items = []
+        for leaf in sorted(rng.sample(range(leaf_count), per_assessment)):
+            current = rng.randint(0, 5)
+            items.append({
+                "leaf": leaf,
+                "current_maturity": current,
+                "target_maturity": rng.randint(current, 5),
+                "notes": words(rng, 5, 30) if rng.random() < 0.6 else "",
+                "evidence_links": [
+                    f"https://docs.example.com/{rng.randrange(10 ** 6)}"
+                    for _ in range(rng.randint(0, 3))
+                ],
+            })
+        assessments.append(items)
+    return assessments
+
+
+def _insert_batched(db: Session, model, rows: List[dict]):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def write_flat_database(path: str, elements: List[CatalogElement], items: List[List[dict]]):
+    import models
+    from catalog_loader import load_catalog
+    from migrations import migrate
+    from rollups import rebuild_rollups
+
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    migrate(engine, models.Base.metadata)
+    with Session(engine) as db:
+        load_catalog(db, SYNTHETIC_FRAMEWORK, elements)
+        leaf_ids = db.execute(
+            select(models.FrameworkElement.id)
+            .where(models.FrameworkElement.level == "subcategory")
+            .order_by(models.FrameworkElement.id)
+        ).scalars().all()
+        for number, assessment_items in enumerate(items, start=1):
+            assessment = models.SecurityAssessment(
+                name=f"Synthetic assessment {number}", description="Generated for benchmarks"
+            )
+            db.add(assessment)
+            db.flush()
+            _insert_batched(db, models.AssessmentItem, [
+                {
+                    "assessment_id": assessment.id,
+                    "framework_element_id": leaf_ids[item["leaf"]],
+                    **{key: value for key, value in item.items() if key != "leaf"},
+                }
+                for item in assessment_items
+            ])
+        rebuild_rollups(db)
+        db.commit()
+    engine.dispose()
+
+
+def write_package_database(path: str, elements: List[CatalogElement], items: List[List[dict]]):
+    from ancestry import materialize_ancestry
+    from app.init_data import insert_framework_elements
+    from app.models import AssessmentItem, Base, FrameworkElement, SecurityAssessment
+    from migrations import migrate
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    migrate(engine, Base.metadata)
+    with Session(engine) as db:
+        inserted = insert_framework_elements(db, nested_catalog(elements))
+        materialize_ancestry(db, FrameworkElement)
+        leaf_ids = sorted(
+            element_id for element_id, level in inserted.values() if level == "subcategory"
+        )
+        for number, assessment_items in enumerate(items, start=1):
+            assessment = SecurityAssessment(
+                name=f"Synthetic assessment {number}", description="Generated for benchmarks"
+            )
+            db.add(assessment)
+            db.flush()
+            _insert_batched(db, AssessmentItem, [
+                {
+                    "assessment_id": assessment.id,
+                    "framework_element_id": leaf_ids[item["leaf"]],
+                    "current_maturity": item["current_maturity"],
+                    "target_maturity": item["target_maturity"],
+                    "notes": item["notes"],
+                    # Stored as JSON text in this app
+                    "evidence_links": json.dumps(item["evidence_links"]),
+                }
+                for item in assessment_items
+            ])
+        db.commit()
+    engine.dispose()
+
+
+def generate(out_dir: str, scale: Scale) -> dict:
+    """Write both databases and a manifest describing them into `out_dir`"""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(scale.seed)
+    elements = synthetic_catalog(scale, rng)
+    leaf_count = sum(1 for element in elements if element.level == "subcategory")
+    items = synthetic_items(scale, leaf_count, rng)
+
+    write_flat_database(os.path.join(out_dir, FLAT_DATABASE), elements, items)
+    write_package_database(os.path.join(out_dir, PACKAGE_DATABASE), elements, items)
+
+    manifest = {
+        "scale": scale._asdict(),
+        "framework": SYNTHETIC_FRAMEWORK,
+        "elements": len(elements),
+        "leaves": leaf_count,
+        "assessments": len(items),
+        # Ids are dense: both databases were empty
+        "items": sum(len(assessment_items) for assessment_items in items),
+        "vocabulary": VOCABULARY,
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def load_manifest(data_dir: str) -> dict:
+    with open(os.path.join(data_dir, MANIFEST)) as file:
+        return json.load(file)
+
+
+def scale_arguments(parser: argparse.ArgumentParser):
+    """Add --scale and the options overriding its fields"""
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--elements", type=int, help="catalog elements")
+    parser.add_argument("--depth", type=int, help="catalog levels")
+    parser.add_argument("--assessments", type=int)
+    parser.add_argument("--items", type=int, help="items per assessment (default: every leaf)")
+    parser.add_argument("--seed", type=int)
+
+
+def scale_from_arguments(args) -> Scale:
+    overrides = {
+        field: getattr(args, field) for field in Scale._fields
+        if getattr(args, field) is not None
+    }
+    return SCALES[args.scale]._replace(**overrides)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    scale_arguments(parser)
+    args = parser.parse_args()
+
+    scale = scale_from_arguments(args)
+    start = time.perf_counter()
+    manifest = generate(args.out_dir, scale)
+    print(f"{manifest['elements']} elements ({manifest['leaves']} leaves), "
+          f"{manifest['assessments']} assessments, {manifest['items']} items "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
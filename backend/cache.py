@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+
+class VersionedCache:
+    """In-process cache of serialized response bodies.
+
+    Each entry remembers the version it was built from; a lookup with a
+    different version is a miss, so bumping the version invalidates
+    every entry without having to clear the cache explicitly.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, version: int, body: bytes) -> None:
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current[0] <= version:
+                self._entries[key] = (version, body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+CACHE_CONTROL = "no-cache"
+
+
+def compute_etag(request: Request, *versions) -> str:
+    """Strong ETag for a read endpoint: path, query string and data versions"""
+    key = "|".join(
+        [request.url.path, str(sorted(request.query_params.multi_items()))]
+        + [str(version) for version in versions]
+    )
+    return '"%s"' % hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches `etag`"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        tag[2:] if tag.startswith("W/") else tag for tag in candidates
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+# Serialized /framework-elements trees keyed by framework
+tree_cache = VersionedCache()
@@ -0,0 +1,28 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+import models
+
+CATALOG_VERSION_ID = 1
+
+
+def get_catalog_version(db: Session) -> int:
+    """Current framework catalog version (0 if the catalog was never versioned)"""
+    version = db.execute(
+        select(models.CatalogVersion.version).where(
+            models.CatalogVersion.id == CATALOG_VERSION_ID
+        )
+    ).scalar()
+    return version or 0
+
+
+def bump_catalog_version(db: Session) -> int:
+    """Increment the catalog version; call in the same transaction as the change"""
+    result = db.execute(
+        update(models.CatalogVersion)
+        .where(models.CatalogVersion.id == CATALOG_VERSION_ID)
+        .values(version=models.CatalogVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.add(models.CatalogVersion(id=CATALOG_VERSION_ID, version=1))
+        db.flush()
+    return get_catalog_version(db)
@@ -0,0 +1,336 @@
+"""Load framework catalogs of any depth from pluggable file formats.
+
+Each format parser turns a file into CatalogElement records (code, title,
+description, level, parent code). load_catalog diffs them against the
+framework's current elements and applies only the changes: new codes are
+inserted, changed ones updated in place (ids, and so assessment items,
+are kept) and codes missing from the file are retired. A content hash
+per framework makes reloading an unchanged file a no-op.
+
+Load or refresh a framework from the command line:
+    python catalog_loader.py seed_data.json CSF [--format levels] [--force]
+"""
+import argparse
+import csv
+import hashlib
+import io
+import sys
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import orjson
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+import models
+from ancestry import materialize_ancestry
+from catalog import bump_catalog_version
+from rollups import ItemChange, apply_item_changes, element_ancestors
+
+# Level names by depth for formats that do not name levels themselves
+DEFAULT_LEVELS = ("function", "category", "subcategory")
+
+
+class CatalogElement(NamedTuple):
+    code: str
+    title: str
+    description: str
+    level: str
+    parent_code: Optional[str] = None
+
+
+class CatalogLoadResult(NamedTuple):
+    framework: str
+    content_hash: str
+    changed: bool  # False when the stored hash matched and nothing was applied
+    inserted: int = 0
+    updated: int = 0
+    retired: int = 0
+    inserted_leaf_ids: List[int] = []  # New elements without children, e.g. subcategories
+
+
+CatalogParser = Callable[[bytes], List[CatalogElement]]
+
+CATALOG_FORMATS: Dict[str, CatalogParser] = {}
+
+
+def catalog_format(name: str):
+    """Register a parser from file contents to CatalogElement records"""
+    def register(parser: CatalogParser) -> CatalogParser:
+        CATALOG_FORMATS[name] = parser
+        return parser
+    return register
+
+
+def default_level(depth: int) -> str:
+    return DEFAULT_LEVELS[depth] if depth < len(DEFAULT_LEVELS) else f"level-{depth}"
+
+
+@catalog_format("levels")
+def parse_levels(data: bytes) -> List[CatalogElement]:
+    """The functions/categories/subcategories layout of seed_data.json.
+
+    Categories name their function and subcategories their category;
+    subcategories without a description use their title.
+    """
+    catalog = orjson.loads(data)
+    elements = [
+        CatalogElement(f["code"], f["title"], f.get("description", ""), "function")
+        for f in catalog["functions"]
+    ]
+    elements += [
+        CatalogElement(c["code"], c["title"], c.get("description", ""), "category", c["function"])
+        for c in catalog["categories"]
+    ]
+    elements += [
+        CatalogElement(s["code"], s["title"], s.get("description", s["title"]), "subcategory", s["category"])
+        for s in catalog["subcategories"]
+    ]
+    return elements
+
+
+@catalog_format("nested")
+def parse_nested(data: bytes) -> List[CatalogElement]:
+    """A list of root elements, each with an optional `children` list, to any depth"""
+    elements = []
+    stack = [(node, None, 0) for node in reversed(orjson.loads(data))]
+    while stack:
+        node, parent_code, depth = stack.pop()
+        elements.append(CatalogElement(
+            node["code"], node["title"], node.get("description", ""),
+            node.get("level", default_level(depth)), parent_code
+        ))
+        stack.extend((child, node["code"], depth + 1) for child in reversed(node.get("children", ())))
+    return elements
+
+
+@catalog_format("flat")
+def parse_flat(data: bytes) -> List[CatalogElement]:
+    """A JSON list of elements naming their parent by code in `parent`"""
+    return [
+        CatalogElement(
+            node["code"], node["title"], node.get("description", ""),
+            node["level"], node.get("parent")
+        )
+        for node in orjson.loads(data)
+    ]
+
+
+@catalog_format("csv")
+def parse_csv(data: bytes) -> List[CatalogElement]:
+    """CSV with code, title, description, level and parent (code) columns"""
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+    return [
+        CatalogElement(
+            row["code"], row["title"], row.get("description") or "",
+            row["level"], row.get("parent") or None
+        )
+        for row in reader
+    ]
+
+
+def detect_catalog_format(path: str, data: bytes) -> str:
+    """Guess a file's format from its extension and JSON shape"""
+    if path.lower().endswith(".csv"):
+        return "csv"
+    catalog = orjson.loads(data)
+    if isinstance(catalog, dict) and "functions" in catalog:
+        return "levels"
+    if isinstance(catalog, list) and any("children" in node for node in catalog):
+        return "nested"
+    if isinstance(catalog, list) and any("parent" in node for node in catalog):
+        return "flat"
+    # A list of roots only is the same in both list formats
+    return "nested"
+
+
+def read_catalog(path: str, format: Optional[str] = None) -> List[CatalogElement]:
+    data = Path(path).read_bytes()
+    format = format or detect_catalog_format(path, data)
+    if format not in CATALOG_FORMATS:
+        raise ValueError(f"Unknown catalog format {format!r}; expected one of {sorted(CATALOG_FORMATS)}")
+    return CATALOG_FORMATS[format](data)
+
+
+def load_order(elements: List[CatalogElement]) -> List[List[CatalogElement]]:
+    """Elements grouped by depth, parents first; validates codes and parents"""
+    by_code: Dict[str, CatalogElement] = {}
+    for element in elements:
+        if element.code in by_code:
+            raise ValueError(f"Duplicate code {element.code!r} in catalog")
+        by_code[element.code] = element
+
+    depths: Dict[str, int] = {}
+    for element in elements:
+        chain = []
+        code = element.code
+        while code is not None and code not in depths:
+            if code in chain:
+                raise ValueError(f"Parent cycle through {code!r} in catalog")
+            if code not in by_code:
+                raise ValueError(f"Unknown parent {code!r} of {chain[-1]!r} in catalog")
+            chain.append(code)
+            code = by_code[code].parent_code
+        depth = -1 if code is None else depths[code]
+        for code in reversed(chain):
+            depth += 1
+            depths[code] = depth
+
+    ordered = sorted(elements, key=lambda element: depths[element.code])
+    return [list(level) for _, level in groupby(ordered, key=lambda element: depths[element.code])]
+
+
+def catalog_hash(elements: List[CatalogElement]) -> str:
+    """Content hash of a catalog, independent of the file format it came from"""
+    return hashlib.sha256(orjson.dumps([tuple(element) for element in elements])).hexdigest()
+
+
+def _move_item_rollups(db: Session, element_ids: List[int], before: dict, after: dict):
+    """Move rollup contributions of items whose element changed position or was retired"""
+    if not element_ids:
+        return
+    item = models.AssessmentItem
+    rows = db.execute(
+        select(item.assessment_id, item.framework_element_id, item.current_maturity, item.target_maturity)
+        .where(item.framework_element_id.in_(element_ids))
+    ).all()
+    apply_item_changes(db, [
+        ItemChange(row.assessment_id, row.framework_element_id, (row.current_maturity, row.target_maturity), None)
+        for row in rows
+    ], ancestors=before)
+    apply_item_changes(db, [
+        ItemChange(row.assessment_id, row.framework_element_id, None, (row.current_maturity, row.target_maturity))
+        for row in rows
+    ], ancestors=after)
+
+
+def load_catalog(
+    db: Session, framework: str, elements: List[CatalogElement], force: bool = False
+) -> CatalogLoadResult:
+    """Make a framework's elements match `elements`; call db.commit() afterwards.
+
+    Skipped when the catalog hash matches the one stored by the previous
+    load, unless `force`. Otherwise elements are matched by code: new ones
+    are inserted one executemany per depth, changed ones updated and ones
+    no longer in the catalog retired, all in bulk. Ancestry, rollups and
+    the catalog version are kept in step; assessment items are not touched.
+    """
+    levels = load_order(elements)
+    content_hash = catalog_hash([element for level in levels for element in level])
+    stored = db.get(models.FrameworkCatalog, framework)
+    if stored is not None and stored.content_hash == content_hash and not force:
+        return CatalogLoadResult(framework, content_hash, changed=False)
+
+    model = models.FrameworkElement
+    existing = {
+        row.code: row for row in db.execute(
+            select(model.id, model.code, model.title, model.description,
+                   model.level, model.parent_id, model.retired)
+            .where(model.framework == framework)
+        )
+    }
+    before = element_ancestors(db, (row.id for row in existing.values()))
+    ids = {code: row.id for code, row in existing.items()}
+
+    inserted: Dict[str, int] = {}
+    updates = []
+    for level in levels:
+        rows = [
+            {
+                "code": element.code,
+                "title": element.title,
+                "description": element.description,
+                "level": element.level,
+                "framework": framework,
+                "parent_id": ids[element.parent_code] if element.parent_code else None,
+            }
+            for element in level
+        ]
+        new_rows = [row for row in rows if row["code"] not in existing]
+        if new_rows:
+            result = db.execute(
+                insert(model).returning(model.code, model.id, sort_by_parameter_order=True),
+                new_rows
+            )
+            inserted.update(result.all())
+            ids.update(inserted)
+        for row in rows:
+            current = existing.get(row["code"])
+            if current is None:
+                continue
+            values = {key: row[key] for key in ("title", "description", "level", "parent_id")}
+            if current.retired or any(getattr(current, key) != value for key, value in values.items()):
+                updates.append({"id": current.id, "retired": False, **values})
+
+    codes = {element.code for level in levels for element in level}
+    retired = [
+        {"id": row.id, "retired": True}
+        for code, row in existing.items()
+        if code not in codes and not row.retired
+    ]
+    if updates:
+        db.execute(update(model), updates)
+    if retired:
+        db.execute(update(model), retired)
+
+    materialize_ancestry(db, model, framework)
+    after = element_ancestors(db, before)
+    _move_item_rollups(db, [id_ for id_ in before if before[id_] != after[id_]], before, after)
+
+    if stored is None:
+        stored = models.FrameworkCatalog(framework=framework)
+        db.add(stored)
+    stored.content_hash = content_hash
+    stored.element_count = len(codes)
+    if inserted or updates or retired:
+        bump_catalog_version(db)
+    db.flush()
+
+    parents = {element.parent_code for level in levels for element in level}
+    return CatalogLoadResult(
+        framework,
+        content_hash,
+        changed=True,
+        inserted=len(inserted),
+        updated=len(updates),
+        retired=len(retired),
+        inserted_leaf_ids=[id_ for code, id_ in inserted.items() if code not in parents],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load or refresh a framework catalog")
+    parser.add_argument("path", help="catalog file")
+    parser.add_argument("framework", help="framework name, e.g. CSF")
+    parser.add_argument("--format", choices=sorted(CATALOG_FORMATS), help="default: guessed from the file")
+    parser.add_argument("--force", action="store_true", help="diff and apply even if the hash is unchanged")
+    args = parser.parse_args()
+
+    from database import SessionLocal, engine
+    from migrations import migrate
+    models.Base.metadata.create_all(bind=engine)
+    migrate(engine, models.Base.metadata)
+
+    try:
+        elements = read_catalog(args.path, args.format)
+    except (ValueError, KeyError) as e:
+        print(f"Cannot read {args.path}: {e}")
+        return 1
+    with SessionLocal() as db:
+        try:
+            result = load_catalog(db, args.framework, elements, force=args.force)
+        except ValueError as e:
+            print(f"Invalid catalog: {e}")
+            return 1
+        db.commit()
+    if not result.changed:
+        print(f"{args.framework} is up to date ({result.content_hash[:12]}).")
+    else:
+        print(f"{args.framework}: {result.inserted} inserted, {result.updated} updated, "
+              f"{result.retired} retired ({result.content_hash[:12]}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,41 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./grc.db"
     
+    # "sync": def routes on Starlette's threadpool with pysqlite sessions.
+    # "async": coroutine routes on AsyncSession/aiosqlite, no threadpool slot per request.
+    db_stack: str = "sync"
+    
+    # SQLite connection profile, applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -65536  # Negative values are KiB (64 MiB)
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout: int = 5000  # ms to wait on a locked database
+    
+    # Read-only connection pool; writes go through a single serialized connection
+    sqlite_read_pool_size: int = 8
+    sqlite_read_max_overflow: int = 8
+    
+    # Request metrics on /metrics; timing headers add X-Query-Count and
+    # Server-Timing to every response, for debugging
+    metrics_enabled: bool = True
+    metrics_timing_headers: bool = False
+    
+    # Opt-in cProfile capture of requests sending "X-Profile: 1" or sampled
+    # at the given rate; sampled profiles are kept only if slower than the
+    # threshold. The newest profiling_max_profiles are kept on disk.
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_min_duration_ms: float = 100.0
+    profiling_dir: str = "profiles"
+    profiling_max_profiles: int = 100
+    
+    # An assessment's item history gets a new checkpoint once this many
+    # revisions (or as many as it has items, if more) were written since
+    # the last one; see history.py
+    history_checkpoint_interval: int = 1000
+    
     class Config:
         env_file = ".env"
 
@@ -1,21 +1,74 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
-
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+from db_stack import ASYNC_STACK, run_with_session
+from metrics import instrument_engine
+from sqlite_profile import (
+    create_async_read_engine,
+    create_async_write_engine,
+    create_read_engine,
+    create_write_engine,
 )
 
+# Writes go through one serialized connection; reads use a read-only pool
+# so under WAL they never queue behind the write lock.
+engine = create_write_engine(settings.database_url, settings)
+read_engine = create_read_engine(settings.database_url, settings, engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+if ASYNC_STACK:
+    async_engine = create_async_write_engine(settings.database_url, settings)
+    async_read_engine = create_async_read_engine(settings.database_url, settings, async_engine)
+    # Objects are serialized after the route returns, outside the greenlet
+    # bridge, so they must not expire (and lazy-reload) on commit.
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine, autoflush=False, expire_on_commit=False
+    )
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    instrument_engine(read_engine)
+    if ASYNC_STACK:
+        instrument_engine(async_engine)
+        instrument_engine(async_read_engine)
 
 Base = declarative_base()
 
 
-def get_db():
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_sync_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+# Route dependencies for the configured stack
+if ASYNC_STACK:
+    get_db, get_read_db = get_async_db, get_async_read_db
+else:
+    get_db, get_read_db = get_sync_db, get_sync_read_db
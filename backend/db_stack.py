@@ -0,0 +1,43 @@
+import functools
+
+from config import settings
+from profiling import profile_route
+
+ASYNC_STACK = settings.db_stack == "async"
+
+
+def run_with_session(endpoint):
+    """Adapt a sync route that takes a `db` session to the configured stack.
+
+    On the sync stack the route stays a def that FastAPI runs in its
+    threadpool; the session is closed as soon as the body returns. The
+    pools are bounded (one writer connection), and response validation and
+    dependency teardown need threadpool slots of their own, so a route
+    holding its connection until then can deadlock against threads queued
+    for that connection. On the async stack the route becomes a coroutine
+    that runs the body through AsyncSession.run_sync, so database waits are
+    awaited on the event loop instead of holding a threadpool slot.
+
+    Either way routes must return fully loaded data, since serialization
+    happens after the body. Requests marked by ProfilingMiddleware run
+    the body under cProfile.
+    """
+    if not ASYNC_STACK:
+        @functools.wraps(endpoint)
+        def run_and_release(*args, **kwargs):
+            try:
+                with profile_route():
+                    return endpoint(*args, **kwargs)
+            finally:
+                # Expunges without expiring, so loaded objects stay usable
+                kwargs["db"].close()
+
+        return run_and_release
+
+    @functools.wraps(endpoint)
+    async def run_async(*args, **kwargs):
+        db = kwargs.pop("db")
+        with profile_route():
+            return await db.run_sync(lambda session: endpoint(*args, db=session, **kwargs))
+
+    return run_async
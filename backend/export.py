@@ -0,0 +1,101 @@
+import csv
+import io
+from typing import Callable, Iterator
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+import models
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FIELDS = [
+    "item_id",
+    "code",
+    "title",
+    "function",
+    "category",
+    "current_maturity",
+    "target_maturity",
+    "notes",
+    "evidence_links",
+]
+
+# Evidence links share one CSV cell, one link per line
+CSV_LINK_SEPARATOR = "\n"
+
+
+def export_query(assessment_id: int):
+    """One row per item joined with its element, function and category codes.
+
+    Ordered by element id so SQLite walks the (assessment_id,
+    framework_element_id) index instead of sorting the whole assessment.
+    """
+    element = models.FrameworkElement
+    function = aliased(models.FrameworkElement)
+    category = aliased(models.FrameworkElement)
+    item = models.AssessmentItem
+    return (
+        select(
+            item.id.label("item_id"),
+            element.code,
+            element.title,
+            function.code.label("function"),
+            category.code.label("category"),
+            item.current_maturity,
+            item.target_maturity,
+            item.notes,
+            item.evidence_links,
+        )
+        .join(element, item.framework_element_id == element.id)
+        .outerjoin(function, element.function_id == function.id)
+        .outerjoin(category, element.category_id == category.id)
+        .where(item.assessment_id == assessment_id, element.retired.is_(False))
+        .order_by(item.framework_element_id)
+    )
+
+
+def ndjson_batch(rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in rows)
+
+
+def csv_batch(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        *values, links = row
+        writer.writerow([*values, CSV_LINK_SEPARATOR.join(links or ())])
+    return buffer.getvalue().encode()
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue().encode()
+
+
+EXPORT_FORMATS = {
+    # format: (media type, header, batch encoder)
+    "ndjson": ("application/x-ndjson", b"", ndjson_batch),
+    "csv": ("text/csv", csv_header(), csv_batch),
+}
+
+
+def stream_export(
+    session_factory: Callable[[], Session], assessment_id: int, format: str
+) -> Iterator[bytes]:
+    """Encoded export chunks, one per batch of EXPORT_BATCH_SIZE rows.
+
+    Opens its own session: the body is streamed after the route has
+    returned and released the request's session. Rows are fetched with
+    yield_per, so memory stays flat however large the assessment is.
+    """
+    _, header, encode = EXPORT_FORMATS[format]
+    if header:
+        yield header
+    with session_factory() as db:
+        result = db.execute(
+            export_query(assessment_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            yield encode(rows)
@@ -0,0 +1,319 @@
+"""Append-only history of assessment item values, with point-in-time reads.
+
+Every write to assessment items also appends, in the same transaction,
+an assessment_item_revisions row per changed item holding only the
+fields that changed (all of them when the item is created). The state as
+of a time t is the latest checkpoint taken at or before t, with the
+revisions written after it, up to t, replayed on top.
+
+A checkpoint copies every item of one assessment inside the database.
+One is taken when an assessment is created or cloned. Another is taken
+whenever the revisions written since the last one reach
+max(history_checkpoint_interval, the assessment's item count). Taking a
+checkpoint so costs no more than the revisions before it, and a
+point-in-time read replays at most that many revisions on top of a
+snapshot, however long the history grows.
+
+Take a checkpoint of every assessment now (e.g. at quarter end):
+    python history.py checkpoint [--assessment ID]
+"""
+import argparse
+import sys
+from datetime import datetime, timezone
+from typing import Collection, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+import models
+from config import settings
+
+HISTORY_FIELDS = ("current_maturity", "target_maturity", "notes", "evidence_links")
+
+
+class ItemRevision(NamedTuple):
+    assessment_id: int
+    item_id: int
+    framework_element_id: int
+    changes: dict  # Field -> new value, for HISTORY_FIELDS that changed
+
+
+class HistoryUnavailable(ValueError):
+    """The history of an assessment does not reach back to the requested time"""
+
+    def __init__(self, assessment_id: int, start: Optional[datetime]):
+        self.assessment_id = assessment_id
+        self.start = start
+        if start is None:
+            message = f"Assessment {assessment_id} has no history"
+        else:
+            message = f"History of assessment {assessment_id} starts at {start.isoformat()}Z"
+        super().__init__(message)
+
+
+class SummaryRow(NamedTuple):
+    """A function_summary_query row with the rollup values as of a past time"""
+    function_id: int
+    function_code: str
+    function_title: str
+    total_subcategories: int
+    sum_current: int
+    sum_target: int
+    item_count: int
+    completed: int
+
+
+def utcnow() -> datetime:
+    """Naive UTC time, as stored in the history tables"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Naive UTC form of `moment`; naive input is taken to be UTC already"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def changed_values(old, new: dict) -> dict:
+    """The HISTORY_FIELDS of `new` whose value differs from `old` (a row or mapping)"""
+    get = old.get if isinstance(old, dict) else lambda field: getattr(old, field)
+    return {
+        field: value for field, value in new.items()
+        if field in HISTORY_FIELDS and get(field) != value
+    }
+
+
+def created_values(values: dict) -> dict:
+    """Revision changes for a new item: every history field"""
+    return {field: values.get(field) for field in HISTORY_FIELDS}
+
+
+def latest_checkpoint(db: Session, assessment_id: int, as_of: Optional[datetime] = None):
+    checkpoint = models.AssessmentItemCheckpoint
+    query = select(
+        checkpoint.id, checkpoint.taken_at, checkpoint.revision_id, checkpoint.item_count
+    ).where(checkpoint.assessment_id == assessment_id)
+    if as_of is not None:
+        query = query.where(checkpoint.taken_at <= as_of)
+    return db.execute(
+        query.order_by(checkpoint.taken_at.desc(), checkpoint.id.desc()).limit(1)
+    ).first()
+
+
+def history_start(db: Session, assessment_id: int) -> Optional[datetime]:
+    """Earliest time the history of an assessment covers, or None if it has none"""
+    checkpoint = models.AssessmentItemCheckpoint
+    revision = models.AssessmentItemRevision
+    starts = [
+        db.execute(
+            select(func.min(column)).where(model.assessment_id == assessment_id)
+        ).scalar()
+        for model, column in ((checkpoint, checkpoint.taken_at), (revision, revision.changed_at))
+    ]
+    return min((start for start in starts if start is not None), default=None)
+
+
+def checkpoint_assessment(db: Session, assessment_id: int, taken_at: Optional[datetime] = None) -> int:
+    """Snapshot every current item of an assessment with one INSERT ... SELECT.
+
+    Call after the transaction's item writes and revisions. Returns the
+    number of items in the checkpoint.
+    """
+    revision = models.AssessmentItemRevision
+    checkpoint = models.AssessmentItemCheckpoint
+    snapshot = models.AssessmentItemCheckpointItem
+    item = models.AssessmentItem
+    # The snapshot is read in SQL: pending ORM changes must be in the database
+    db.flush()
+    # Writes are serialized, so every revision up to the newest one is in the snapshot
+    last_revision = db.execute(select(func.max(revision.id))).scalar() or 0
+    checkpoint_id = db.execute(
+        insert(checkpoint).values(
+            assessment_id=assessment_id,
+            taken_at=taken_at or utcnow(),
+            revision_id=last_revision,
+            item_count=0
+        ).returning(checkpoint.id)
+    ).scalar_one()
+    item_count = db.execute(
+        insert(snapshot).from_select(
+            ["checkpoint_id", "item_id", "framework_element_id", *HISTORY_FIELDS],
+            select(
+                literal(checkpoint_id), item.id, item.framework_element_id,
+                *(getattr(item, field) for field in HISTORY_FIELDS)
+            ).where(item.assessment_id == assessment_id)
+        )
+    ).rowcount
+    db.execute(
+        update(checkpoint).where(checkpoint.id == checkpoint_id).values(item_count=item_count)
+    )
+    db.execute(
+        update(models.SecurityAssessment)
+        .where(models.SecurityAssessment.id == assessment_id)
+        .values(revisions_since_checkpoint=0)
+    )
+    return item_count
+
+
+def _count_revisions(db: Session, assessment_id: int, count: int, changed_at: datetime):
+    """Add to the assessment's pending revisions and checkpoint it once they are due"""
+    assessment = models.SecurityAssessment
+    pending = db.execute(
+        update(assessment)
+        .where(assessment.id == assessment_id)
+        .values(revisions_since_checkpoint=assessment.revisions_since_checkpoint + count)
+        .returning(assessment.revisions_since_checkpoint)
+    ).scalar()
+    if pending is None or pending < settings.history_checkpoint_interval:
+        return
+    last = latest_checkpoint(db, assessment_id)
+    if last is None or pending >= last.item_count:
+        checkpoint_assessment(db, assessment_id, changed_at)
+
+
+def record_revisions(db: Session, revisions: Iterable[ItemRevision]) -> int:
+    """Append revisions for item writes; call in the same transaction as the writes.
+
+    Revisions without changes are skipped. Returns the number recorded.
+    """
+    changed_at = utcnow()
+    rows = [
+        {**revision._asdict(), "changed_at": changed_at}
+        for revision in revisions if revision.changes
+    ]
+    if not rows:
+        return 0
+    db.execute(insert(models.AssessmentItemRevision), rows)
+    counts: Dict[int, int] = {}
+    for row in rows:
+        counts[row["assessment_id"]] = counts.get(row["assessment_id"], 0) + 1
+    for assessment_id, count in counts.items():
+        _count_revisions(db, assessment_id, count, changed_at)
+    return len(rows)
+
+
+def items_as_of(
+    db: Session, assessment_id: int, as_of: datetime, item_ids: Optional[Collection[int]] = None
+) -> Dict[int, dict]:
+    """Item id -> framework_element_id and HISTORY_FIELDS as they were at `as_of` (UTC).
+
+    Items created after `as_of` are absent. With `item_ids`, only those
+    items are read and replayed. Raises HistoryUnavailable if `as_of` is
+    before the assessment's history starts, rather than answering with no
+    items.
+    """
+    revision = models.AssessmentItemRevision
+    snapshot = models.AssessmentItemCheckpointItem
+    state: Dict[int, dict] = {}
+    query = select(revision.item_id, revision.framework_element_id, revision.changes).where(
+        revision.assessment_id == assessment_id,
+        revision.changed_at <= as_of
+    )
+    checkpoint = latest_checkpoint(db, assessment_id, as_of)
+    if checkpoint is None and db.execute(query.limit(1)).first() is None:
+        raise HistoryUnavailable(assessment_id, history_start(db, assessment_id))
+    snapshot_query = select(
+        snapshot.item_id, snapshot.framework_element_id,
+        *(getattr(snapshot, field) for field in HISTORY_FIELDS)
+    )
+    if item_ids is not None:
+        query = query.where(revision.item_id.in_(item_ids))
+        snapshot_query = snapshot_query.where(snapshot.item_id.in_(item_ids))
+    if checkpoint is not None:
+        for row in db.execute(snapshot_query.where(snapshot.checkpoint_id == checkpoint.id)):
+            state[row.item_id] = dict(row._mapping)
+        query = query.where(
+            revision.changed_at >= checkpoint.taken_at,
+            revision.id > checkpoint.revision_id
+        )
+    for row in db.execute(query.order_by(revision.id)):
+        item = state.setdefault(row.item_id, {
+            "item_id": row.item_id, "framework_element_id": row.framework_element_id
+        })
+        item.update(row.changes)
+    return state
+
+
+def summary_rows_as_of(db: Session, rows, assessment_id: int, as_of: datetime) -> List[SummaryRow]:
+    """function_summary_query rows with their rollup columns recomputed as of `as_of`.
+
+    Catalog columns (titles, subcategory totals) stay as they are now.
+    Raises HistoryUnavailable like items_as_of.
+    """
+    state = items_as_of(db, assessment_id, as_of)
+    element = models.FrameworkElement
+    item = models.AssessmentItem
+    # Function of each of the assessment's items, as /assessment-items lists them
+    function_of = db.execute(
+        select(item.id, element.function_id)
+        .join(item.framework_element)
+        .where(item.assessment_id == assessment_id, element.retired.is_(False))
+    ).all()
+    totals: Dict[int, List[int]] = {}
+    for item_id, function_id in function_of:
+        past = state.get(item_id)
+        if past is None or function_id is None:
+            continue
+        current = past.get("current_maturity") or 0
+        total = totals.setdefault(function_id, [0, 0, 0, 0])
+        total[0] += current
+        total[1] += past.get("target_maturity") or 0
+        total[2] += 1
+        total[3] += current > 0
+    return [
+        SummaryRow(
+            row.function_id, row.function_code, row.function_title, row.total_subcategories,
+            *totals.get(row.function_id, (0, 0, 0, 0))
+        )
+        for row in rows
+    ]
+
+
+def ensure_history(db: Session):
+    """Start the history of assessments that predate it with a checkpoint of their items"""
+    checkpoint = models.AssessmentItemCheckpoint
+    missing = db.execute(
+        select(models.SecurityAssessment.id).where(
+            ~select(checkpoint.id).where(
+                checkpoint.assessment_id == models.SecurityAssessment.id
+            ).exists()
+        )
+    ).scalars().all()
+    if missing:
+        taken_at = utcnow()
+        for assessment_id in missing:
+            checkpoint_assessment(db, assessment_id, taken_at)
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assessment item history maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    checkpoint_parser = commands.add_parser("checkpoint", help="checkpoint assessments now")
+    checkpoint_parser.add_argument("--assessment", type=int, help="default: every assessment")
+    args = parser.parse_args()
+
+    from database import SessionLocal, engine
+    from migrations import migrate
+    models.Base.metadata.create_all(bind=engine)
+    migrate(engine, models.Base.metadata)
+
+    with SessionLocal() as db:
+        if args.assessment is not None:
+            if db.get(models.SecurityAssessment, args.assessment) is None:
+                print(f"No assessment {args.assessment}")
+                return 1
+            assessment_ids = [args.assessment]
+        else:
+            assessment_ids = db.execute(select(models.SecurityAssessment.id)).scalars().all()
+        taken_at = utcnow()
+        for assessment_id in assessment_ids:
+            items = checkpoint_assessment(db, assessment_id, taken_at)
+            print(f"Assessment {assessment_id}: checkpoint of {items} items")
+        db.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+import codecs
+import csv
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+import models
+import schemas
+from assessments import DEFAULT_ITEM_VALUES, bump_assessment_revision
+from export import CSV_LINK_SEPARATOR
+from history import ItemRevision, changed_values, created_values, record_revisions
+from rollups import ItemChange, apply_item_changes
+
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_FIELDS = ("current_maturity", "target_maturity", "notes", "evidence_links")
+
+# (row number, record, errors); record is None when the row could not be parsed
+ParsedRow = Tuple[int, Optional[dict], Optional[List[dict]]]
+
+
+def _error(loc: str, msg: str, type_: str) -> dict:
+    return {"loc": [loc], "msg": msg, "type": type_}
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """"csv" or "ndjson" from an upload's file name or content type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    media_type = (content_type or "").split(";")[0].strip()
+    if media_type == "text/csv":
+        return "csv"
+    if media_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def read_csv(file: BinaryIO) -> Iterator[ParsedRow]:
+    """Parse CSV records (with a header row) from a binary stream.
+
+    Empty cells are left out, so they keep the item's current value;
+    evidence links are one per line within their cell, as exported.
+    """
+    reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+    row = 0
+    try:
+        for row, record in enumerate(reader, start=1):
+            record = {
+                key: value for key, value in record.items()
+                if key is not None and value not in (None, "")
+            }
+            if "evidence_links" in record:
+                record["evidence_links"] = [
+                    link.strip() for link in record["evidence_links"].split(CSV_LINK_SEPARATOR)
+                    if link.strip()
+                ]
+            yield row, record, None
+    except (csv.Error, UnicodeDecodeError) as e:
+        # The reader cannot resume after a malformed record
+        yield row + 1, None, [_error("file", f"Unreadable CSV: {e}", "parse_error")]
+
+
+def read_ndjson(file: BinaryIO) -> Iterator[ParsedRow]:
+    """Parse one JSON object per line from a binary stream, skipping blank lines"""
+    row = 0
+    for line in file:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row, None, [_error("line", f"Invalid JSON: {e}", "parse_error")]
+            continue
+        if not isinstance(record, dict):
+            yield row, None, [_error("line", "Expected a JSON object", "parse_error")]
+            continue
+        yield row, record, None
+
+
+IMPORT_READERS = {
+    "csv": read_csv,
+    "ndjson": read_ndjson,
+}
+
+
+def code_map(db: Session, assessment_id: int, framework: Optional[str] = None) -> Dict[str, Optional[int]]:
+    """Subcategory code -> element id; codes shared by several frameworks map to None.
+
+    Without `framework`, only codes of the frameworks the assessment
+    already has items in are mapped, so an import cannot pull another
+    framework's subcategories into it by accident.
+    """
+    query = select(models.FrameworkElement.code, models.FrameworkElement.id).where(
+        models.FrameworkElement.level == "subcategory",
+        models.FrameworkElement.retired.is_(False)
+    )
+    if framework is not None:
+        query = query.where(models.FrameworkElement.framework == framework)
+    else:
+        query = query.where(models.FrameworkElement.framework.in_(
+            select(models.FrameworkElement.framework)
+            .join(models.AssessmentItem)
+            .where(models.AssessmentItem.assessment_id == assessment_id)
+            .distinct()
+        ))
+    codes: Dict[str, Optional[int]] = {}
+    for code, element_id in db.execute(query):
+        codes[code] = None if code in codes else element_id
+    return codes
+
+
+def _validate(
+    record: dict, codes: Dict[str, Optional[int]]
+) -> Tuple[Optional[int], Optional[dict], List[dict]]:
+    """(element id, update values, errors) for one parsed record"""
+    code = record.get("code")
+    if not isinstance(code, str) or not code:
+        return None, None, [_error("code", "Field required", "missing")]
+    if code not in codes:
+        return None, None, [_error("code", "Unknown subcategory code", "not_found")]
+    if codes[code] is None:
+        return None, None, [_error(
+            "code", "Code exists in several frameworks; pass framework", "ambiguous"
+        )]
+    try:
+        values = schemas.AssessmentItemUpdate.model_validate(
+            {key: record[key] for key in IMPORT_FIELDS if key in record}
+        ).model_dump(exclude_unset=True)
+    except ValidationError as e:
+        return None, None, e.errors(include_url=False, include_context=False, include_input=False)
+    return codes[code], values, []
+
+
+def _apply_batch(db: Session, assessment_id: int, values_by_element: Dict[int, dict]) -> Tuple[int, int]:
+    """Upsert one batch of items in its own transaction; returns (created, updated)"""
+    existing = {
+        row.framework_element_id: row for row in db.execute(
+            select(
+                models.AssessmentItem.id,
+                models.AssessmentItem.framework_element_id,
+                models.AssessmentItem.current_maturity,
+                models.AssessmentItem.target_maturity,
+                models.AssessmentItem.notes,
+                models.AssessmentItem.evidence_links
+            ).where(
+                models.AssessmentItem.assessment_id == assessment_id,
+                models.AssessmentItem.framework_element_id.in_(values_by_element)
+            )
+        )
+    }
+
+    updates, inserts, changes, revisions = [], [], [], []
+    for element_id, values in values_by_element.items():
+        old = existing.get(element_id)
+        if old is None:
+            row = {
+                **DEFAULT_ITEM_VALUES,
+                **values,
+                "assessment_id": assessment_id,
+                "framework_element_id": element_id,
+            }
+            inserts.append(row)
+            changes.append(ItemChange(
+                assessment_id, element_id, None,
+                (row["current_maturity"], row["target_maturity"])
+            ))
+            continue
+        # Only values that differ count as an update
+        values = {field: value for field, value in values.items() if getattr(old, field) != value}
+        if not values:
+            continue
+        updates.append({"id": old.id, **values})
+        revisions.append(ItemRevision(
+            assessment_id, old.id, element_id, changed_values(old, values)
+        ))
+        changes.append(ItemChange(
+            assessment_id, element_id,
+            (old.current_maturity, old.target_maturity),
+            (
+                values.get("current_maturity", old.current_maturity),
+                values.get("target_maturity", old.target_maturity)
+            )
+        ))
+
+    if not updates and not inserts:
+        # Nothing changed: leave the revision, and so the ETags, alone
+        return 0, 0
+    if updates:
+        # One executemany per distinct column set
+        updates.sort(key=lambda values: sorted(values))
+        db.execute(update(models.AssessmentItem), updates)
+    if inserts:
+        created = db.execute(
+            insert(models.AssessmentItem).returning(
+                models.AssessmentItem.id, sort_by_parameter_order=True
+            ),
+            inserts
+        ).scalars().all()
+        revisions += [
+            ItemRevision(assessment_id, item_id, row["framework_element_id"], created_values(row))
+            for item_id, row in zip(created, inserts)
+        ]
+    apply_item_changes(db, changes)
+    record_revisions(db, revisions)
+    bump_assessment_revision(db, assessment_id)
+    db.commit()
+    return len(inserts), len(updates)
+
+
+def import_items(
+    db: Session,
+    assessment_id: int,
+    rows: Iterable[ParsedRow],
+    codes: Dict[str, Optional[int]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> schemas.ImportResponse:
+    """Upsert parsed rows into an assessment, committing every `batch_size` rows.
+
+    Rows are keyed by element code; a later row for the same code wins.
+    Invalid rows are skipped and reported by row number. Batches already
+    committed stay applied if a later one fails.
+    """
+    created = updated = 0
+    errors: List[schemas.ImportRowError] = []
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        values_by_element: Dict[int, dict] = {}
+        for row, record, parse_errors in batch:
+            code = record.get("code") if record is not None else None
+            if parse_errors is None:
+                element_id, values, parse_errors = _validate(record, codes)
+            if parse_errors:
+                errors.append(schemas.ImportRowError(
+                    row=row,
+                    code=code if isinstance(code, str) else None,
+                    errors=parse_errors
+                ))
+                continue
+            values_by_element.setdefault(element_id, {}).update(values)
+        if values_by_element:
+            batch_created, batch_updated = _apply_batch(db, assessment_id, values_by_element)
+            created += batch_created
+            updated += batch_updated
+    return schemas.ImportResponse(
+        created=created,
+        updated=updated,
+        failed=len(errors),
+        errors=errors
+    )
@@ -1,15 +1,74 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from typing import Any, List, Dict, Optional
+import orjson
 import models
 import schemas
-from database import engine, get_db
+from ancestry import ensure_ancestry, subtree_filter
+from assessments import (
+    bump_assessment_revision,
+    copy_assessment_items,
+    get_assessment_revision,
+    populate_assessment,
+)
+from cache import cache_headers, compute_etag, is_not_modified, not_modified, tree_cache
+from catalog import get_catalog_version
+from config import settings
+from database import ReadSessionLocal, SessionLocal, engine, get_db, get_read_db, run_with_session
+from export import EXPORT_FORMATS, stream_export
+from history import (
+    HistoryUnavailable,
+    ItemRevision,
+    as_utc,
+    checkpoint_assessment,
+    changed_values,
+    ensure_history,
+    items_as_of,
+    record_revisions,
+    summary_rows_as_of,
+)
+from item_import import IMPORT_READERS, code_map, detect_format, import_items
+from metrics import MetricsMiddleware, RequestMetrics
+from profiling import ProfilingMiddleware, profile_store, router as profiling_router
+from migrations import migrate
+from rollups import (
+    ItemChange,
+    apply_item_changes,
+    compare_query,
+    ensure_rollups,
+    function_summary_query,
+    rebuild_rollups,
+)
+from search import fts_query, search_elements, search_notes
+from serialization import encode_nested_rows, encode_rows, json_response, schema_columns, schema_fields
+from tree import build_tree
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
+migrate(engine, models.Base.metadata)
+with SessionLocal() as db:
+    ensure_ancestry(db, models.FrameworkElement)
+    ensure_rollups(db)
+    ensure_history(db)
 
-app = FastAPI(title="GRC POC API")
+MAX_PAGE_SIZE = 1000
+MAX_COMPARED_ASSESSMENTS = 200
+
+# Column selections for the endpoints that bypass Pydantic serialization
+ELEMENT_FIELDS = schema_fields(schemas.FrameworkElement)
+ELEMENT_COLUMNS = schema_columns(schemas.FrameworkElement, models.FrameworkElement)
+ITEM_FIELDS = schema_fields(schemas.AssessmentItemDetail)
+ITEM_COLUMNS = schema_columns(schemas.AssessmentItemDetail, models.AssessmentItem)
+ASSESSMENT_FIELDS = schema_fields(schemas.SecurityAssessment)
+ASSESSMENT_COLUMNS = schema_columns(schemas.SecurityAssessment, models.SecurityAssessment)
+
+app = FastAPI(title="GRC POC API", default_response_class=ORJSONResponse)
 
 # CORS configuration
 app.add_middleware(
@@ -20,17 +79,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sample_rate=settings.profiling_sample_rate,
+        min_duration_ms=settings.profiling_min_duration_ms
+    )
+    app.include_router(profiling_router)
+
+request_metrics = RequestMetrics()
+if settings.metrics_enabled:
+    # Added last, so it is outermost and times CORS handling and profiling too
+    app.add_middleware(
+        MetricsMiddleware,
+        metrics=request_metrics,
+        timing_headers=settings.metrics_timing_headers
+    )
 
-def build_tree(elements: List[models.FrameworkElement], parent_id=None):
-    """Build hierarchical tree structure"""
-    tree = []
-    for element in elements:
-        if element.parent_id == parent_id:
-            node = schemas.FrameworkElement.from_orm(element)
-            node_dict = node.model_dump()
-            node_dict['children'] = build_tree(elements, element.id)
-            tree.append(node_dict)
-    return tree
+
+def serialize_element(row) -> dict:
+    """Serialize a framework element row selected with ELEMENT_COLUMNS"""
+    return dict(zip(ELEMENT_FIELDS, row))
 
 
 @app.get("/")
@@ -38,42 +108,172 @@ def read_root():
     return {"message": "GRC POC API v0.1"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Request latency, SQL query counts and rows per route, for Prometheus"""
+    return request_metrics.response()
+
+
 @app.get("/framework-elements", response_model=List[Dict])
+@run_with_session
 def get_framework_elements(
+    request: Request,
     framework: str = "CSF",
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get framework elements as a tree structure. Filter by framework: CSF or Privacy"""
-    elements = db.query(models.FrameworkElement).filter(
-        models.FrameworkElement.framework == framework
-    ).all()
-    tree = build_tree(elements)
-    return tree
+    version = get_catalog_version(db)
+    etag = compute_etag(request, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    body = tree_cache.get(framework, version)
+    if body is None:
+        elements = db.execute(
+            select(*ELEMENT_COLUMNS)
+            .where(
+                models.FrameworkElement.framework == framework,
+                models.FrameworkElement.retired.is_(False)
+            )
+            .order_by(models.FrameworkElement.id)
+        ).all()
+        tree = build_tree(elements, serialize_element)
+        body = orjson.dumps(tree)
+        tree_cache.set(framework, version, body)
+    return json_response(body, cache_headers(etag))
 
 
 @app.get("/framework-elements/flat", response_model=List[schemas.FrameworkElement])
-def get_framework_elements_flat(db: Session = Depends(get_db)):
+@run_with_session
+def get_framework_elements_flat(
+    request: Request,
+    db: Session = Depends(get_read_db)
+):
     """Get all framework elements as flat list"""
-    elements = db.query(models.FrameworkElement).all()
-    return elements
+    etag = compute_etag(request, get_catalog_version(db))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    rows = db.execute(
+        select(*ELEMENT_COLUMNS)
+        .where(models.FrameworkElement.retired.is_(False))
+        .order_by(models.FrameworkElement.id)
+    ).all()
+    return json_response(encode_rows(ELEMENT_FIELDS, rows), cache_headers(etag))
+
+
+def item_rows_as_of(db: Session, query, assessment_id: int, as_of: datetime,
+                    min_maturity: Optional[int], max_maturity: Optional[int], limit: Optional[int]):
+    """Rows of an item query with the item columns replaced by their values at `as_of`.
+
+    The maturity filters and limit apply to the past values, so they are
+    applied here rather than in SQL. With `limit`, items are read in pages
+    of `limit` ids and history is replayed for one page at a time; further
+    pages are read only while filtered-out items leave the result short.
+    """
+    id_index = ITEM_FIELDS.index("id")
+    rows = []
+    page_query = query
+    while True:
+        page = db.execute(page_query if limit is None else page_query.limit(limit)).all()
+        state = items_as_of(
+            db, assessment_id, as_of,
+            None if limit is None else [row[id_index] for row in page]
+        )
+        for row in page:
+            item = state.get(row[id_index])
+            if item is None:
+                continue
+            current = item.get("current_maturity")
+            if min_maturity is not None and (current is None or current < min_maturity):
+                continue
+            if max_maturity is not None and (current is None or current > max_maturity):
+                continue
+            values = {**item, "id": row[id_index], "assessment_id": assessment_id}
+            rows.append(tuple(values.get(field) for field in ITEM_FIELDS) + tuple(row[len(ITEM_FIELDS):]))
+            if limit is not None and len(rows) == limit:
+                return rows
+        if limit is None or len(page) < limit:
+            return rows
+        page_query = query.where(models.AssessmentItem.id > page[-1][id_index])
 
 
 @app.get("/assessment-items", response_model=List[schemas.AssessmentItemDetail])
+@run_with_session
 def get_assessment_items(
+    request: Request,
     assessment_id: int = 1,
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    code_prefix: Optional[str] = None,
+    path: Optional[str] = None,
+    min_maturity: Optional[int] = Query(None, ge=0, le=5),
+    max_maturity: Optional[int] = Query(None, ge=0, le=5),
+    as_of: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get all assessment items for a specific assessment"""
-    items = db.query(models.AssessmentItem).filter(
-        models.AssessmentItem.assessment_id == assessment_id
-    ).all()
-    return items
+    """Get assessment items for a specific assessment.
+
+    Without `limit` every item is returned. With `limit` items come in
+    pages ordered by id; pass the last id seen as `after` to get the next
+    page (also advertised in the Link header). `code_prefix` filters on the
+    element code (e.g. "ID" or "ID.AM"), `path` on the subtree of an
+    element path (e.g. "ID/ID.AM"), `min_maturity`/`max_maturity` on
+    current maturity. Items of retired elements are left out.
+    With `as_of` (ISO 8601, UTC unless it has an offset) the item values
+    are those at that time, from the item history; items created later
+    are left out. A time before the assessment's history starts is a 422.
+    """
+    etag = compute_etag(
+        request, get_catalog_version(db), get_assessment_revision(db, assessment_id)
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    headers = cache_headers(etag)
+    
+    query = select(*ITEM_COLUMNS, *ELEMENT_COLUMNS).join(
+        models.AssessmentItem.framework_element
+    ).where(
+        models.AssessmentItem.assessment_id == assessment_id,
+        models.FrameworkElement.retired.is_(False)
+    )
+    if code_prefix:
+        query = query.where(
+            models.FrameworkElement.code.startswith(code_prefix, autoescape=True)
+        )
+    if path:
+        query = query.where(subtree_filter(models.FrameworkElement, path))
+    if after is not None:
+        query = query.where(models.AssessmentItem.id > after)
+    query = query.order_by(models.AssessmentItem.id)
+    if as_of is not None:
+        try:
+            rows = item_rows_as_of(db, query, assessment_id, as_utc(as_of), min_maturity, max_maturity, limit)
+        except HistoryUnavailable as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    else:
+        if min_maturity is not None:
+            query = query.where(models.AssessmentItem.current_maturity >= min_maturity)
+        if max_maturity is not None:
+            query = query.where(models.AssessmentItem.current_maturity <= max_maturity)
+        if limit is not None:
+            query = query.limit(limit)
+        rows = db.execute(query).all()
+    if limit is not None and len(rows) == limit:
+        last_id = rows[-1][ITEM_FIELDS.index("id")]
+        next_url = request.url.include_query_params(after=last_id)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    body = encode_nested_rows(ITEM_FIELDS, "framework_element", ELEMENT_FIELDS, rows)
+    return json_response(body, headers)
 
 
 @app.get("/assessment-items/{item_id}", response_model=schemas.AssessmentItemDetail)
-def get_assessment_item(item_id: int, db: Session = Depends(get_db)):
+@run_with_session
+def get_assessment_item(item_id: int, db: Session = Depends(get_read_db)):
     """Get a specific assessment item"""
-    item = db.query(models.AssessmentItem).filter(
+    item = db.query(models.AssessmentItem).options(
+        joinedload(models.AssessmentItem.framework_element)
+    ).filter(
         models.AssessmentItem.id == item_id
     ).first()
     if not item:
@@ -81,23 +281,128 @@ def get_assessment_item(item_id: int, db: Session = Depends(get_db)):
     return item
 
 
+@app.patch("/assessment-items/bulk", response_model=schemas.BulkUpdateResponse)
+@run_with_session
+def bulk_update_assessment_items(
+    payload: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Update many assessment items in one transaction.
+
+    Each entry is an `id` plus at least one AssessmentItemUpdate field.
+    Entries that fail validation, have no fields or reference unknown items
+    are reported per index and skipped; the rest are applied with a single executemany UPDATE.
+    """
+    results = []
+    updates: Dict[int, dict] = {}
+    for index, entry in enumerate(payload):
+        try:
+            item_update = schemas.AssessmentItemBulkUpdate.model_validate(entry)
+        except ValidationError as e:
+            results.append(schemas.BulkUpdateResult(
+                index=index,
+                id=entry.get("id") if isinstance(entry.get("id"), int) else None,
+                status="invalid",
+                errors=e.errors(include_url=False, include_context=False, include_input=False)
+            ))
+            continue
+        values = item_update.model_dump(exclude_unset=True)
+        if values.keys() == {"id"}:
+            results.append(schemas.BulkUpdateResult(
+                index=index,
+                id=item_update.id,
+                status="invalid",
+                errors=[{"loc": [], "msg": "No fields to update", "type": "no_fields"}]
+            ))
+            continue
+        updates.setdefault(item_update.id, {}).update(values)
+        results.append(schemas.BulkUpdateResult(index=index, id=item_update.id, status="updated"))
+    
+    existing = {
+        row.id: row for row in db.query(
+            models.AssessmentItem.id,
+            models.AssessmentItem.assessment_id,
+            models.AssessmentItem.framework_element_id,
+            models.AssessmentItem.current_maturity,
+            models.AssessmentItem.target_maturity,
+            models.AssessmentItem.notes,
+            models.AssessmentItem.evidence_links
+        ).filter(models.AssessmentItem.id.in_(updates))
+    } if updates else {}
+    
+    for result in results:
+        if result.status == "updated" and result.id not in existing:
+            result.status = "not_found"
+            result.errors = [{"loc": ["id"], "msg": "Assessment item not found", "type": "not_found"}]
+    
+    # ORM bulk UPDATE by primary key: one executemany per distinct column set
+    rows = [
+        values for item_id, values in updates.items()
+        if item_id in existing
+    ]
+    if rows:
+        rows.sort(key=lambda values: sorted(values))
+        db.execute(update(models.AssessmentItem), rows)
+    apply_item_changes(db, [
+        ItemChange(
+            old.assessment_id,
+            old.framework_element_id,
+            (old.current_maturity, old.target_maturity),
+            (
+                values.get("current_maturity", old.current_maturity),
+                values.get("target_maturity", old.target_maturity)
+            )
+        )
+        for old, values in ((existing[values["id"]], values) for values in rows)
+    ])
+    record_revisions(db, [
+        ItemRevision(old.assessment_id, old.id, old.framework_element_id, changed_values(old, values))
+        for old, values in ((existing[values["id"]], values) for values in rows)
+    ])
+    for assessment_id in {existing[values["id"]].assessment_id for values in rows}:
+        bump_assessment_revision(db, assessment_id)
+    db.commit()
+    
+    updated = sum(1 for result in results if result.status == "updated")
+    return schemas.BulkUpdateResponse(
+        updated=updated,
+        failed=len(results) - updated,
+        results=results
+    )
+
+
 @app.patch("/assessment-items/{item_id}", response_model=schemas.AssessmentItemDetail)
+@run_with_session
 def update_assessment_item(
     item_id: int,
     item_update: schemas.AssessmentItemUpdate,
     db: Session = Depends(get_db)
 ):
     """Update an assessment item"""
-    db_item = db.query(models.AssessmentItem).filter(
+    db_item = db.query(models.AssessmentItem).options(
+        joinedload(models.AssessmentItem.framework_element)
+    ).filter(
         models.AssessmentItem.id == item_id
     ).first()
     
     if not db_item:
         raise HTTPException(status_code=404, detail="Assessment item not found")
     
+    old_maturity = (db_item.current_maturity, db_item.target_maturity)
     update_data = item_update.model_dump(exclude_unset=True)
+    changes = changed_values(db_item, update_data)
     for key, value in update_data.items():
         setattr(db_item, key, value)
+    apply_item_changes(db, [ItemChange(
+        db_item.assessment_id,
+        db_item.framework_element_id,
+        old_maturity,
+        (db_item.current_maturity, db_item.target_maturity)
+    )])
+    record_revisions(db, [ItemRevision(
+        db_item.assessment_id, db_item.id, db_item.framework_element_id, changes
+    )])
+    bump_assessment_revision(db, db_item.assessment_id)
     
     db.commit()
     db.refresh(db_item)
@@ -105,51 +410,315 @@ def update_assessment_item(
 
 
 @app.get("/summary", response_model=Dict)
-def get_summary(assessment_id: int = 1, db: Session = Depends(get_db)):
-    """Get summary statistics by Function"""
-    # Get all assessment items with their framework elements
-    items = db.query(models.AssessmentItem).filter(
-        models.AssessmentItem.assessment_id == assessment_id
-    ).all()
+@run_with_session
+def get_summary(
+    request: Request,
+    response: Response,
+    assessment_id: int = 1,
+    framework: Optional[str] = None,
+    as_of: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get summary statistics by Function, optionally for a single framework.
+
+    With `as_of` (ISO 8601, UTC unless it has an offset) the maturity
+    figures are those at that time, from the item history. A time before
+    the assessment's history starts is a 422.
+    """
+    etag = compute_etag(
+        request, get_catalog_version(db), get_assessment_revision(db, assessment_id)
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
     
-    # Get all functions
-    functions = db.query(models.FrameworkElement).filter(
-        models.FrameworkElement.level == "function"
-    ).all()
+    rows = db.execute(function_summary_query(assessment_id, framework)).all()
+    if as_of is not None:
+        try:
+            rows = summary_rows_as_of(db, rows, assessment_id, as_utc(as_of))
+        except HistoryUnavailable as e:
+            raise HTTPException(status_code=422, detail=str(e))
     
-    summary = []
-    for function in functions:
-        # Get all subcategories under this function
-        subcategories = []
-        for category in function.children:
-            subcategories.extend(category.children)
-        
-        # Get assessment items for these subcategories
-        subcategory_ids = [sub.id for sub in subcategories]
-        function_items = [
-            item for item in items 
-            if item.framework_element_id in subcategory_ids
-        ]
-        
-        if function_items:
-            avg_current = sum(item.current_maturity for item in function_items) / len(function_items)
-            avg_target = sum(item.target_maturity for item in function_items) / len(function_items)
-            completed = sum(1 for item in function_items if item.current_maturity > 0)
-        else:
-            avg_current = 0
-            avg_target = 0
-            completed = 0
-        
-        summary.append({
-            "function_code": function.code,
-            "function_name": function.title,
-            "avg_current_maturity": round(avg_current, 2),
-            "avg_target_maturity": round(avg_target, 2),
-            "total_subcategories": len(subcategory_ids),
-            "completed_subcategories": completed
-        })
+    summary = [
+        {
+            "function_code": row.function_code,
+            "function_name": row.function_title,
+            "avg_current_maturity": round(row.sum_current / row.item_count, 2) if row.item_count else 0.0,
+            "avg_target_maturity": round(row.sum_target / row.item_count, 2) if row.item_count else 0.0,
+            "total_subcategories": row.total_subcategories,
+            "completed_subcategories": row.completed
+        }
+        for row in rows
+    ]
     
     return {
         "assessment_id": assessment_id,
         "summary": summary
     }
+
+
+@app.get("/search", response_model=Dict)
+@run_with_session
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    framework: Optional[str] = None,
+    assessment_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Full-text search over element code/title/description and item notes.
+
+    Every word of `q` must match, as a prefix. Elements and notes are
+    ranked separately by bm25 (lower `score` is better) since their
+    scores are not comparable. Snippets are HTML: the text is escaped and
+    matches are marked with <mark></mark>.
+    """
+    match = fts_query(q)
+    if match is None:
+        return {"query": q, "elements": [], "notes": []}
+    try:
+        elements = search_elements(db, match, framework, limit)
+        notes = search_notes(db, match, framework, assessment_id, limit)
+    except OperationalError as e:
+        if "no such table" in str(e):
+            raise HTTPException(status_code=503, detail="Full-text search is not available")
+        raise
+    return {
+        "query": q,
+        "elements": elements,
+        "notes": notes,
+    }
+
+
+@app.get("/assessments", response_model=List[schemas.SecurityAssessment])
+@run_with_session
+def get_assessments(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """List assessments by id, optionally in keyset pages like /assessment-items"""
+    query = select(*ASSESSMENT_COLUMNS).order_by(models.SecurityAssessment.id)
+    if after is not None:
+        query = query.where(models.SecurityAssessment.id > after)
+    if limit is not None:
+        query = query.limit(limit)
+    
+    rows = db.execute(query).all()
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        next_url = request.url.include_query_params(after=rows[-1].id)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return json_response(encode_rows(ASSESSMENT_FIELDS, rows), headers)
+
+
+@app.post("/assessments", response_model=schemas.SecurityAssessment, status_code=201)
+@run_with_session
+def create_assessment(
+    assessment: schemas.SecurityAssessmentCreate,
+    db: Session = Depends(get_db)
+):
+    """Create an assessment, with a default item per subcategory of `framework` if given"""
+    if assessment.framework is not None and db.execute(
+        select(models.FrameworkElement.id)
+        .where(models.FrameworkElement.framework == assessment.framework)
+        .limit(1)
+    ).first() is None:
+        raise HTTPException(status_code=404, detail="Framework not found")
+    
+    db_assessment = models.SecurityAssessment(
+        name=assessment.name, description=assessment.description
+    )
+    db.add(db_assessment)
+    db.flush()
+    if assessment.framework is not None:
+        populate_assessment(db, db_assessment.id, assessment.framework)
+        rebuild_rollups(db, db_assessment.id)
+    # Starts the assessment's item history
+    checkpoint_assessment(db, db_assessment.id)
+    db.commit()
+    db.refresh(db_assessment)
+    return db_assessment
+
+
+@app.get("/assessments/compare", response_model=schemas.CompareResponse)
+@run_with_session
+def compare_assessments(
+    request: Request,
+    ids: str = Query(..., pattern=r"^\d+(,\d+)*$"),
+    group_by: str = Query("function", pattern="^(function|category)$"),
+    framework: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Compare assessments (comma-separated `ids`) per function or category.
+
+    The payload is columnar: `groups` holds one array per attribute, and
+    each entry of `assessments` one array per metric, aligned with the
+    groups. Averages are null where an assessment has no items in a group.
+    """
+    assessment_ids = list(dict.fromkeys(int(id_) for id_ in ids.split(",")))
+    if len(assessment_ids) > MAX_COMPARED_ASSESSMENTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {MAX_COMPARED_ASSESSMENTS} assessments can be compared"
+        )
+    assessments = {
+        row.id: row for row in db.execute(
+            select(
+                models.SecurityAssessment.id,
+                models.SecurityAssessment.name,
+                models.SecurityAssessment.revision
+            ).where(models.SecurityAssessment.id.in_(assessment_ids))
+        )
+    }
+    missing = [id_ for id_ in assessment_ids if id_ not in assessments]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Assessments not found: {missing}")
+    
+    etag = compute_etag(
+        request, get_catalog_version(db),
+        *(assessments[id_].revision for id_ in assessment_ids)
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    # Pivot the (group, assessment) rollup rows into per-assessment columns
+    position = {assessment_id: index for index, assessment_id in enumerate(assessment_ids)}
+    groups = []
+    cells = {}
+    for row in db.execute(compare_query(assessment_ids, group_by, framework)):
+        if not groups or groups[-1].id != row.id:
+            groups.append(row)
+        cells[(len(groups) - 1, position[row.assessment_id])] = row
+    
+    def average(total, count):
+        return round(total / count, 2) if count else None
+    
+    series = []
+    for index, assessment_id in enumerate(assessment_ids):
+        column = [cells.get((group, index)) for group in range(len(groups))]
+        series.append({
+            "id": assessment_id,
+            "name": assessments[assessment_id].name,
+            "avg_current_maturity": [
+                average(cell.sum_current, cell.item_count) if cell else None for cell in column
+            ],
+            "avg_target_maturity": [
+                average(cell.sum_target, cell.item_count) if cell else None for cell in column
+            ],
+            "item_count": [cell.item_count if cell else 0 for cell in column],
+            "completed_subcategories": [cell.completed_count if cell else 0 for cell in column],
+        })
+    
+    payload = {
+        "group_by": group_by,
+        "groups": {
+            "code": [group.code for group in groups],
+            "title": [group.title for group in groups],
+            "total_subcategories": [group.total_subcategories for group in groups],
+        },
+        "assessments": series,
+    }
+    return json_response(orjson.dumps(payload), cache_headers(etag))
+
+
+@app.get("/assessments/{assessment_id}", response_model=schemas.SecurityAssessment)
+@run_with_session
+def get_assessment(assessment_id: int, db: Session = Depends(get_read_db)):
+    """Get a specific assessment"""
+    assessment = db.get(models.SecurityAssessment, assessment_id)
+    if assessment is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return assessment
+
+
+@app.post(
+    "/assessments/{assessment_id}/clone",
+    response_model=schemas.SecurityAssessment,
+    status_code=201
+)
+@run_with_session
+def clone_assessment(
+    assessment_id: int,
+    clone: Optional[schemas.SecurityAssessmentClone] = None,
+    db: Session = Depends(get_db)
+):
+    """Copy an assessment with all its items (maturities, notes, evidence).
+
+    Items and rollups are copied with INSERT ... SELECT inside the
+    database, so cloning costs the same whatever the assessment's size.
+    """
+    source = db.get(models.SecurityAssessment, assessment_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    clone = clone or schemas.SecurityAssessmentClone()
+    
+    db_assessment = models.SecurityAssessment(
+        name=clone.name if clone.name is not None else f"{source.name} (copy)",
+        description=clone.description if clone.description is not None else source.description
+    )
+    db.add(db_assessment)
+    db.flush()
+    copy_assessment_items(db, source.id, db_assessment.id)
+    checkpoint_assessment(db, db_assessment.id)
+    db.commit()
+    db.refresh(db_assessment)
+    return db_assessment
+
+
+@app.get("/assessments/{assessment_id}/export")
+@run_with_session
+def export_assessment(
+    assessment_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_read_db)
+):
+    """Stream every item of an assessment joined with its element.
+
+    One row per item with element code and title, function and category
+    codes, maturities, notes and evidence links, as NDJSON or CSV (links
+    one per line within their cell).
+    """
+    if db.get(models.SecurityAssessment, assessment_id) is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    media_type = EXPORT_FORMATS[format][0]
+    filename = f"assessment-{assessment_id}.{format}"
+    return StreamingResponse(
+        stream_export(ReadSessionLocal, assessment_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.post("/assessments/{assessment_id}/import", response_model=schemas.ImportResponse)
+@run_with_session
+def import_assessment(
+    assessment_id: int,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    framework: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Upsert assessment items from a CSV or NDJSON upload keyed by element `code`.
+
+    Recognised fields are current_maturity, target_maturity, notes and
+    evidence_links; other columns (such as those of an export) are
+    ignored, as are empty CSV cells. Codes are matched within the
+    frameworks the assessment already has items in; pass `framework` to
+    add items from another one. The format comes from `format`, else
+    the file name or content type. Rows are applied in batches, each in
+    its own transaction; invalid rows are skipped and reported by row.
+    """
+    if db.get(models.SecurityAssessment, assessment_id) is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    format = format or detect_format(file.filename, file.content_type)
+    if format is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot tell the upload format; pass format=csv or format=ndjson"
+        )
+    
+    rows = IMPORT_READERS[format](file.file)
+    return import_items(db, assessment_id, rows, code_map(db, assessment_id, framework))
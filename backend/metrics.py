@@ -0,0 +1,260 @@
+"""Per-request latency and SQL metrics, exposed in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and labels it with the route
+template (e.g. /assessment-items/{item_id}), so label cardinality stays
+bounded. Engines passed to instrument_engine report each cursor execute
+to the request being served through a context variable; the variable is
+copied into the threadpool for sync routes and into SQLAlchemy's greenlet
+for async ones, so both stacks are counted. Rows are the rowcount of
+statements that return none, plus the rows of Session results that are
+not streamed.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+# Route label for requests that matched no route, e.g. 404s
+UNMATCHED_ROUTE = "unmatched"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class QueryStats:
+    """SQL activity of one request"""
+
+    __slots__ = ("queries", "sql_time", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.rows = 0
+
+
+_current_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.sql_time += time.perf_counter() - conn.info["query_start"].pop()
+    stats.queries += 1
+    # Rows a statement returns are counted when fetched, by _count_fetched_rows
+    if cursor.description is None and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for a failed statement, so drop its
+    # start time here; a connection runs one statement at a time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def _count_fetched_rows(orm_execute_state):
+    """Count the rows a Session statement returns, buffering them to do so.
+
+    Streamed results (yield_per or stream_results) are passed through
+    uncounted, so they stay streamed.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        return None
+    state = orm_execute_state
+    options = state.execution_options
+    if options.get("yield_per") or options.get("stream_results"):
+        return None
+    # DML without RETURNING is counted by its rowcount instead
+    is_dml = state.is_insert or state.is_update or state.is_delete
+    if not (state.is_select or (is_dml and state.statement.exported_columns)):
+        return None
+    frozen = state.invoke_statement().freeze()
+    stats.rows += len(frozen.data)
+    return frozen()
+
+
+def instrument_engine(engine) -> None:
+    """Report the engine's queries to the request being served (idempotent)"""
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+        event.listen(target, "handle_error", _handle_error)
+    if not event.contains(Session, "do_orm_execute", _count_fetched_rows):
+        event.listen(Session, "do_orm_execute", _count_fetched_rows)
+
+
+class Histogram:
+    """Bucketed observations per label set"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # labels -> (per-bucket counts incl. +Inf, [sum, count])
+        self.series: Dict[tuple, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+        counts, totals = series
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Process-local request metrics for one app"""
+
+    ROUTE_LABELS = ("method", "route")
+    STATUS_LABELS = ("method", "route", "status")
+
+    def __init__(self, prefix: str = "grc"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._requests: Dict[tuple, int] = {}
+        self._latency = Histogram(LATENCY_BUCKETS)
+        self._queries = Histogram(QUERY_COUNT_BUCKETS)
+        self._sql_seconds: Dict[tuple, float] = {}
+        self._rows: Dict[tuple, int] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: QueryStats) -> None:
+        labels = (method, route)
+        with self._lock:
+            key = (method, route, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._latency.observe(labels, seconds)
+            self._queries.observe(labels, stats.queries)
+            self._sql_seconds[labels] = self._sql_seconds.get(labels, 0.0) + stats.sql_time
+            self._rows[labels] = self._rows.get(labels, 0) + stats.rows
+
+    def _counter(self, lines: List[str], name: str, help_: str, names, values: dict) -> None:
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in sorted(values.items()):
+            lines.append(f"{name}{_labels(names, labels)} {_number(value)}")
+
+    def _histogram(self, lines: List[str], name: str, help_: str, histogram: Histogram) -> None:
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} histogram")
+        bounds = [_number(bound) for bound in histogram.buckets] + ["+Inf"]
+        for labels, (counts, (total, count)) in sorted(histogram.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                bucket_labels = _labels(self.ROUTE_LABELS, labels, 'le="%s"' % bound)
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_labels(self.ROUTE_LABELS, labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(self.ROUTE_LABELS, labels)} {count}")
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        p = self.prefix
+        lines: List[str] = []
+        with self._lock:
+            self._counter(lines, f"{p}_http_requests_total", "HTTP requests by route and status.",
+                          self.STATUS_LABELS, self._requests)
+            self._histogram(lines, f"{p}_http_request_duration_seconds",
+                            "HTTP request latency by route, until the response body is sent.",
+                            self._latency)
+            self._histogram(lines, f"{p}_db_queries_per_request",
+                            "SQL statements executed per request.", self._queries)
+            self._counter(lines, f"{p}_db_query_duration_seconds_total",
+                          "Time spent executing SQL statements.", self.ROUTE_LABELS, self._sql_seconds)
+            self._counter(lines, f"{p}_db_rows_total",
+                          "Rows fetched by, or affected by, SQL statements.", self.ROUTE_LABELS, self._rows)
+        return "\n".join(lines) + "\n"
+
+    def response(self) -> Response:
+        return Response(self.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def timing_headers(seconds: float, stats: QueryStats) -> Dict[str, str]:
+    """X-Query-Count and Server-Timing values for one request so far"""
+    return {
+        "X-Query-Count": str(stats.queries),
+        "Server-Timing": (
+            f"app;dur={seconds * 1000:.2f}, "
+            f'db;dur={stats.sql_time * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows"'
+        ),
+    }
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording each request into a RequestMetrics.
+
+    With `timing_headers` the response also carries X-Query-Count and
+    Server-Timing, measured when the response starts (a streamed body's
+    later queries are in the metrics only).
+    """
+
+    def __init__(self, app, metrics: RequestMetrics, timing_headers: bool = False):
+        self.app = app
+        self.metrics = metrics
+        self.timing_headers = timing_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.timing_headers:
+                    headers = MutableHeaders(scope=message)
+                    for name, value in timing_headers(time.perf_counter() - start, stats).items():
+                        headers.append(name, value)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_stats.reset(token)
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            self.metrics.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - start,
+                stats,
+            )
@@ -0,0 +1,60 @@
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Engine
+
+from search import ensure_search_indexes
+
+# Columns added after a table was first created: (table, column, DDL).
+# create_all() never alters existing tables, so older database files get
+# these through ALTER TABLE on startup.
+ADDED_COLUMNS = [
+    ("security_assessments", "revision", "INTEGER NOT NULL DEFAULT 0"),
+    ("framework_elements", "function_id", "INTEGER REFERENCES framework_elements (id)"),
+    ("framework_elements", "category_id", "INTEGER REFERENCES framework_elements (id)"),
+    ("framework_elements", "depth", "INTEGER"),
+    ("framework_elements", "path", "VARCHAR"),
+    ("framework_elements", "retired", "BOOLEAN NOT NULL DEFAULT 0"),
+    ("security_assessments", "revisions_since_checkpoint", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def add_missing_columns(conn, metadata: MetaData, tables: set):
+    inspector = inspect(conn)
+    for table, column, ddl in ADDED_COLUMNS:
+        if table not in tables or column not in metadata.tables[table].c:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def sync_indexes(conn, metadata: MetaData, tables: set):
+    """Create model indexes missing from the database.
+
+    An existing index with the same name but different columns or
+    uniqueness (e.g. the old globally unique ix_framework_elements_code)
+    is dropped and recreated.
+    """
+    inspector = inspect(conn)
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {index["name"]: index for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            current = existing.get(index.name)
+            if current is not None:
+                if (
+                    bool(current["unique"]) == bool(index.unique)
+                    and current["column_names"] == [c.name for c in index.columns]
+                ):
+                    continue
+                conn.execute(text(f'DROP INDEX "{index.name}"'))
+            index.create(conn)
+
+
+def migrate(engine: Engine, metadata: MetaData):
+    """Bring an existing database up to date with the current models"""
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        add_missing_columns(conn, metadata, tables)
+        sync_indexes(conn, metadata, tables)
+        ensure_search_indexes(conn, tables)
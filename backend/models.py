@@ -1,21 +1,38 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, ForeignKey, JSON, Index, false
 from sqlalchemy.orm import relationship
 from database import Base
 
 
 class FrameworkElement(Base):
     __tablename__ = "framework_elements"
+    __table_args__ = (
+        # Codes are only unique within a framework. Unique indexes rather than
+        # table constraints so migrations can add them to existing databases.
+        Index("uq_framework_elements_framework_code", "framework", "code", unique=True),
+        Index("ix_framework_elements_framework_level", "framework", "level"),
+        Index("ix_framework_elements_function_level", "function_id", "level"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    code = Column(String, unique=True, index=True)  # e.g., "ID.AM-01"
+    code = Column(String, index=True)  # e.g., "ID.AM-01"
     title = Column(String)
     description = Column(Text)
-    level = Column(String)  # "function" | "category" | "subcategory"
+    level = Column(String, index=True)  # "function" | "category" | "subcategory"
     framework = Column(String, default="CSF")  # "CSF" | "Privacy"
-    parent_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True)
+    parent_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True, index=True)
+    
+    # Materialized ancestry, maintained by ancestry.materialize_ancestry
+    function_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=True, index=True)
+    depth = Column(Integer, nullable=True)  # 0 for functions
+    path = Column(String, nullable=True, index=True)  # e.g., "ID/ID.AM/ID.AM-01"
+    # Dropped from its catalog by catalog_loader; kept so its items survive
+    retired = Column(Boolean, nullable=False, default=False, server_default=false())
     
     # Relationships
-    parent = relationship("FrameworkElement", remote_side=[id], backref="children")
+    parent = relationship(
+        "FrameworkElement", remote_side=[id], foreign_keys=[parent_id], backref="children"
+    )
     assessment_items = relationship("AssessmentItem", back_populates="framework_element")
 
 
@@ -25,6 +42,8 @@ class SecurityAssessment(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     description = Column(Text)
+    revision = Column(Integer, nullable=False, default=0)  # Bumped on every item change
+    revisions_since_checkpoint = Column(Integer, nullable=False, default=0)  # See history.py
     
     # Relationships
     assessment_items = relationship("AssessmentItem", back_populates="assessment")
@@ -32,10 +51,20 @@ class SecurityAssessment(Base):
 
 class AssessmentItem(Base):
     __tablename__ = "assessment_items"
+    __table_args__ = (
+        Index(
+            "uq_assessment_items_assessment_element",
+            "assessment_id", "framework_element_id",
+            unique=True
+        ),
+        # Entries are (assessment_id, rowid), so per-assessment keyset pages
+        # by id are index ranges with no sort step
+        Index("ix_assessment_items_assessment_id", "assessment_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     assessment_id = Column(Integer, ForeignKey("security_assessments.id"))
-    framework_element_id = Column(Integer, ForeignKey("framework_elements.id"))
+    framework_element_id = Column(Integer, ForeignKey("framework_elements.id"), index=True)
     current_maturity = Column(Integer, default=0)  # 0-5
     target_maturity = Column(Integer, default=0)   # 0-5
     notes = Column(Text)
@@ -44,3 +73,75 @@ class AssessmentItem(Base):
     # Relationships
     assessment = relationship("SecurityAssessment", back_populates="assessment_items")
     framework_element = relationship("FrameworkElement", back_populates="assessment_items")
+
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # Bumped on every framework_elements change
+
+
+class FrameworkCatalog(Base):
+    __tablename__ = "framework_catalogs"
+    
+    framework = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)  # Of the catalog last loaded, see catalog_loader
+    element_count = Column(Integer, nullable=False, default=0)
+
+
+class MaturityRollup(Base):
+    __tablename__ = "maturity_rollups"
+    __table_args__ = (
+        Index("uq_maturity_rollups_assessment_element", "assessment_id", "element_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    assessment_id = Column(Integer, ForeignKey("security_assessments.id"), nullable=False)
+    element_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=False)  # Function or category
+    sum_current = Column(Integer, nullable=False, default=0)
+    sum_target = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)  # Items with current_maturity > 0
+
+
+class AssessmentItemRevision(Base):
+    """Append-only change log of assessment items, see history.py"""
+    __tablename__ = "assessment_item_revisions"
+    __table_args__ = (
+        Index("ix_assessment_item_revisions_assessment_changed", "assessment_id", "changed_at"),
+        Index("ix_assessment_item_revisions_item", "item_id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    assessment_id = Column(Integer, ForeignKey("security_assessments.id"), nullable=False)
+    item_id = Column(Integer, ForeignKey("assessment_items.id"), nullable=False)
+    framework_element_id = Column(Integer, ForeignKey("framework_elements.id"), nullable=False)
+    changed_at = Column(DateTime, nullable=False)  # UTC
+    changes = Column(JSON, nullable=False)  # Changed fields only; every field when the item was created
+
+
+class AssessmentItemCheckpoint(Base):
+    """Snapshot of every item of an assessment, so history is replayed from here"""
+    __tablename__ = "assessment_item_checkpoints"
+    __table_args__ = (
+        Index("ix_assessment_item_checkpoints_assessment_taken", "assessment_id", "taken_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    assessment_id = Column(Integer, ForeignKey("security_assessments.id"), nullable=False)
+    taken_at = Column(DateTime, nullable=False)  # UTC
+    revision_id = Column(Integer, nullable=False, default=0)  # Last revision included in the snapshot
+    item_count = Column(Integer, nullable=False, default=0)
+
+
+class AssessmentItemCheckpointItem(Base):
+    __tablename__ = "assessment_item_checkpoint_items"
+    
+    checkpoint_id = Column(Integer, ForeignKey("assessment_item_checkpoints.id"), primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    framework_element_id = Column(Integer, nullable=False)
+    current_maturity = Column(Integer)
+    target_maturity = Column(Integer)
+    notes = Column(Text)
+    evidence_links = Column(JSON)
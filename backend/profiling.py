@@ -0,0 +1,202 @@
+"""Opt-in cProfile capture of individual requests.
+
+With PROFILING_ENABLED, ProfilingMiddleware marks a request for profiling
+when it sends `X-Profile: 1` or is picked at PROFILING_SAMPLE_RATE.
+run_with_session then runs the route body under cProfile: the queries,
+ORM loading and response encoding the route does itself. Pydantic
+response validation happens after the body and is not included. On the
+async stack the profiler covers the event loop thread while the route
+awaits, so concurrent requests can show up in the same profile.
+
+Profiles are kept as .pstats files with a JSON sidecar in a bounded ring
+buffer directory, newest first on GET /debug/profiles.
+"""
+import contextlib
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import random
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Functions shown by the text rendering of a profile
+TEXT_STATS_LIMIT = 60
+
+PROFILE_ID_PATTERN = re.compile(r"^\d{13}-[0-9a-f]{6}$")
+
+
+class ProfileCapture:
+    """A request marked for profiling, and its profile once the route ran"""
+
+    __slots__ = ("id", "requested", "profile")
+
+    def __init__(self, requested: bool):
+        # Millisecond timestamp first, so ids sort by capture time
+        self.id = f"{time.time_ns() // 1_000_000:013d}-{secrets.token_hex(3)}"
+        self.requested = requested
+        self.profile: Optional[cProfile.Profile] = None
+
+
+_current_capture: contextvars.ContextVar[Optional[ProfileCapture]] = contextvars.ContextVar(
+    "current_profile_capture", default=None
+)
+
+
+@contextlib.contextmanager
+def profile_route():
+    """Run the enclosed route body under cProfile if the request is marked"""
+    capture = _current_capture.get()
+    if capture is None or capture.profile is not None:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        capture.profile = profile
+
+
+class ProfileStore:
+    """Directory of the most recent `max_profiles` request profiles"""
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def save(self, capture: ProfileCapture, metadata: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        capture.profile.dump_stats(self.directory / f"{capture.id}.pstats")
+        # Written last: a profile is listed only once it is complete
+        (self.directory / f"{capture.id}.json").write_text(
+            json.dumps({"id": capture.id, **metadata})
+        )
+        self._prune()
+
+    def _prune(self) -> None:
+        stale = sorted(self.directory.glob("*.pstats"))[:-self.max_profiles]
+        for path in stale:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+
+    def list(self) -> List[dict]:
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profiles.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # Pruned or still being written by another worker
+                continue
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.pstats"
+        return path if path.is_file() else None
+
+
+profile_store = ProfileStore(settings.profiling_dir, settings.profiling_max_profiles)
+
+
+def profile_text(path: Path, limit: int = TEXT_STATS_LIMIT) -> str:
+    """The `limit` functions with the most cumulative time, as pstats prints them"""
+    stream = io.StringIO()
+    stats = pstats.Stats(str(path), stream=stream)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware choosing which requests run_with_session profiles.
+
+    Requested profiles are always kept; sampled ones only if the request
+    took at least `min_duration_ms`, so sampling collects slow calls.
+    """
+
+    def __init__(self, app, store: ProfileStore, sample_rate: float = 0.0, min_duration_ms: float = 0.0):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.min_duration_ms = min_duration_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = dict(scope["headers"]).get(PROFILE_HEADER, b"") in (b"1", b"true")
+        if not requested and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        capture = ProfileCapture(requested)
+        token = _current_capture.set(capture)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if capture.profile is not None and requested:
+                    message.setdefault("headers", []).append(
+                        (PROFILE_ID_HEADER.lower().encode(), capture.id.encode())
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _current_capture.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            if capture.profile is not None and (requested or duration_ms >= self.min_duration_ms):
+                route = scope.get("route")
+                metadata = {
+                    "method": scope["method"],
+                    "route": getattr(route, "path", None),
+                    "path": scope["path"],
+                    "query_string": scope["query_string"].decode("latin-1"),
+                    "status": status,
+                    "duration_ms": round(duration_ms, 3),
+                    "trigger": "header" if requested else "sample",
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                }
+                await run_in_threadpool(self.store.save, capture, metadata)
+
+
+router = APIRouter(prefix="/debug/profiles", tags=["debug"])
+
+
+@router.get("")
+def list_profiles():
+    """Stored request profiles, newest first"""
+    return profile_store.list()
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, format: str = Query("pstats", pattern="^(pstats|text)$")):
+    """Download a profile as .pstats (for pstats, snakeviz, ...) or as a text summary"""
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "text":
+        return PlainTextResponse(profile_text(path))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
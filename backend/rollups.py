@@ -0,0 +1,303 @@
+"""Incrementally maintained maturity rollups per assessment, function and category.
+
+Every write path that changes assessment items must call
+apply_item_changes (or rebuild_rollups) in the same transaction.
+
+Check the table against a from-scratch recomputation:
+    python rollups.py [--repair]
+"""
+import argparse
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql import Select
+
+import models
+
+Maturity = Tuple[Optional[int], Optional[int]]  # (current, target)
+Ancestors = Tuple[Optional[int], Optional[int]]  # (function_id, category_id)
+
+
+class ItemChange(NamedTuple):
+    """One assessment item change; `old` is None for inserts, `new` for deletes"""
+    assessment_id: int
+    framework_element_id: int
+    old: Optional[Maturity]
+    new: Optional[Maturity]
+
+
+def _contribution(maturity: Optional[Maturity]) -> Tuple[int, int, int, int]:
+    """(sum_current, sum_target, item_count, completed_count) of one item"""
+    if maturity is None:
+        return 0, 0, 0, 0
+    current, target = (value or 0 for value in maturity)
+    return current, target, 1, 1 if current > 0 else 0
+
+
+def element_ancestors(db: Session, element_ids: Iterable[int]) -> Dict[int, Ancestors]:
+    """(function_id, category_id) each element's items roll up under.
+
+    Retired elements map to (None, None): their items are not counted.
+    """
+    return {
+        row.id: (None, None) if row.retired else (row.function_id, row.category_id)
+        for row in db.execute(
+            select(
+                models.FrameworkElement.id,
+                models.FrameworkElement.function_id,
+                models.FrameworkElement.category_id,
+                models.FrameworkElement.retired
+            ).where(models.FrameworkElement.id.in_(set(element_ids)))
+        )
+    }
+
+
+def apply_item_changes(
+    db: Session,
+    changes: Iterable[ItemChange],
+    ancestors: Optional[Dict[int, Ancestors]] = None
+) -> int:
+    """Adjust rollup rows by the delta of each change.
+
+    Deltas are merged per (assessment, function/category) and written
+    with one executemany upsert. `ancestors` overrides the current
+    element_ancestors, e.g. to take items out from under an element's
+    previous position. Returns the number of rollup rows touched.
+    """
+    changes = list(changes)
+    if not changes:
+        return 0
+    if ancestors is None:
+        ancestors = element_ancestors(db, (change.framework_element_id for change in changes))
+
+    deltas: Dict[Tuple[int, int], list] = defaultdict(lambda: [0, 0, 0, 0])
+    for change in changes:
+        old = _contribution(change.old)
+        new = _contribution(change.new)
+        for rollup_element_id in ancestors.get(change.framework_element_id, ()):
+            if rollup_element_id is None:
+                continue
+            delta = deltas[(change.assessment_id, rollup_element_id)]
+            for i in range(4):
+                delta[i] += new[i] - old[i]
+
+    rows = [
+        {
+            "assessment_id": assessment_id,
+            "element_id": element_id,
+            "sum_current": delta[0],
+            "sum_target": delta[1],
+            "item_count": delta[2],
+            "completed_count": delta[3],
+        }
+        for (assessment_id, element_id), delta in deltas.items()
+        if any(delta)
+    ]
+    if rows:
+        stmt = sqlite_insert(models.MaturityRollup)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["assessment_id", "element_id"],
+                set_={
+                    column: getattr(models.MaturityRollup, column) + getattr(stmt.excluded, column)
+                    for column in ("sum_current", "sum_target", "item_count", "completed_count")
+                }
+            ),
+            rows
+        )
+    return len(rows)
+
+
+def recompute_query(assessment_id: Optional[int] = None) -> Select:
+    """Rollup rows aggregated from scratch over assessment_items"""
+    item = models.AssessmentItem
+    element = aliased(models.FrameworkElement)
+    current = func.coalesce(item.current_maturity, 0)
+
+    def grouped(ancestor_column):
+        stmt = (
+            select(
+                item.assessment_id.label("assessment_id"),
+                ancestor_column.label("element_id"),
+                func.sum(current).label("sum_current"),
+                func.sum(func.coalesce(item.target_maturity, 0)).label("sum_target"),
+                func.count(item.id).label("item_count"),
+                func.sum(case((current > 0, 1), else_=0)).label("completed_count"),
+            )
+            .join(element, element.id == item.framework_element_id)
+            .where(ancestor_column.is_not(None), element.retired.is_(False))
+            .group_by(item.assessment_id, ancestor_column)
+        )
+        if assessment_id is not None:
+            stmt = stmt.where(item.assessment_id == assessment_id)
+        return stmt
+
+    return union_all(grouped(element.function_id), grouped(element.category_id))
+
+
+def rebuild_rollups(db: Session, assessment_id: Optional[int] = None):
+    """Replace rollup rows with a from-scratch recomputation (one INSERT ... SELECT)"""
+    stmt = delete(models.MaturityRollup)
+    if assessment_id is not None:
+        stmt = stmt.where(models.MaturityRollup.assessment_id == assessment_id)
+    db.execute(stmt)
+    columns = ["assessment_id", "element_id", "sum_current", "sum_target",
+               "item_count", "completed_count"]
+    db.execute(
+        insert(models.MaturityRollup).from_select(columns, recompute_query(assessment_id))
+    )
+
+
+def ensure_rollups(db: Session):
+    """Build rollups on databases that have items but predate the rollup table"""
+    has_rollups = db.execute(select(models.MaturityRollup.id).limit(1)).first()
+    has_items = db.execute(select(models.AssessmentItem.id).limit(1)).first()
+    if has_items is not None and has_rollups is None:
+        rebuild_rollups(db)
+        db.commit()
+
+
+def function_summary_query(assessment_id: int, framework: Optional[str] = None) -> Select:
+    """One row per function: its rollup plus the catalog's subcategory count"""
+    function = aliased(models.FrameworkElement)
+    subcategory = aliased(models.FrameworkElement)
+    rollup = models.MaturityRollup
+    total_subcategories = (
+        select(func.count(subcategory.id))
+        .where(
+            subcategory.function_id == function.id,
+            subcategory.level == "subcategory",
+            subcategory.retired.is_(False)
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            function.id.label("function_id"),
+            function.code.label("function_code"),
+            function.title.label("function_title"),
+            total_subcategories.label("total_subcategories"),
+            func.coalesce(rollup.sum_current, 0).label("sum_current"),
+            func.coalesce(rollup.sum_target, 0).label("sum_target"),
+            func.coalesce(rollup.item_count, 0).label("item_count"),
+            func.coalesce(rollup.completed_count, 0).label("completed"),
+        )
+        .select_from(function)
+        .outerjoin(
+            rollup,
+            (rollup.element_id == function.id) & (rollup.assessment_id == assessment_id)
+        )
+        .where(function.level == "function", function.retired.is_(False))
+        .order_by(function.id)
+    )
+    if framework is not None:
+        stmt = stmt.where(function.framework == framework)
+    return stmt
+
+
+def compare_query(
+    assessment_ids: Sequence[int], group_by: str = "function", framework: Optional[str] = None
+) -> Select:
+    """Rollup rows of several assessments per function or category, ordered by group.
+
+    One row per (group, assessment) with items in it: the group's id,
+    code, title and catalog subcategory count, the assessment id and its
+    sum_current, sum_target, item_count and completed_count. Groups
+    without items in any of the assessments are left out.
+    """
+    group = aliased(models.FrameworkElement)
+    subcategory = aliased(models.FrameworkElement)
+    rollup = models.MaturityRollup
+    ancestor_column = subcategory.function_id if group_by == "function" else subcategory.category_id
+    # Counted once per group rather than once per (group, assessment) row
+    totals = (
+        select(ancestor_column.label("group_id"), func.count(subcategory.id).label("total"))
+        .where(subcategory.level == "subcategory", subcategory.retired.is_(False))
+        .group_by(ancestor_column)
+        .subquery()
+    )
+    stmt = (
+        select(
+            group.id,
+            group.code,
+            group.title,
+            func.coalesce(totals.c.total, 0).label("total_subcategories"),
+            rollup.assessment_id,
+            rollup.sum_current,
+            rollup.sum_target,
+            rollup.item_count,
+            rollup.completed_count,
+        )
+        .join(rollup, rollup.element_id == group.id)
+        .outerjoin(totals, totals.c.group_id == group.id)
+        .where(
+            rollup.assessment_id.in_(assessment_ids),
+            rollup.item_count > 0,
+            group.level == group_by,
+            group.retired.is_(False)
+        )
+        .order_by(group.id)
+    )
+    if framework is not None:
+        stmt = stmt.where(group.framework == framework)
+    return stmt
+
+
+def diff_rollups(db: Session):
+    """Differences between stored rollups and a from-scratch recomputation.
+
+    Returns (assessment_id, element_id, stored, expected) tuples, where the
+    values are (sum_current, sum_target, item_count, completed_count) or
+    None for a missing row. Rows that are all zero count as missing.
+    """
+    def as_map(rows):
+        return {
+            (row.assessment_id, row.element_id): (
+                row.sum_current, row.sum_target, row.item_count, row.completed_count
+            )
+            for row in rows
+            if any((row.sum_current, row.sum_target, row.item_count, row.completed_count))
+        }
+
+    stored = as_map(db.execute(select(models.MaturityRollup)).scalars())
+    expected = as_map(db.execute(recompute_query()).all())
+    return [
+        (key[0], key[1], stored.get(key), expected.get(key))
+        for key in sorted(set(stored) | set(expected))
+        if stored.get(key) != expected.get(key)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check maturity rollups against assessment items")
+    parser.add_argument("--repair", action="store_true", help="rebuild the rollups if they differ")
+    args = parser.parse_args()
+
+    from database import SessionLocal, engine
+    from migrations import migrate
+    models.Base.metadata.create_all(bind=engine)
+    migrate(engine, models.Base.metadata)
+
+    with SessionLocal() as db:
+        differences = diff_rollups(db)
+        for assessment_id, element_id, stored, expected in differences:
+            print(f"assessment {assessment_id} element {element_id}: "
+                  f"stored {stored} expected {expected}")
+        if not differences:
+            print("Rollups are consistent.")
+            return 0
+        print(f"{len(differences)} rollup row(s) differ.")
+        if args.repair:
+            rebuild_rollups(db)
+            db.commit()
+            print("Rollups rebuilt.")
+            return 0
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 
 class FrameworkElementBase(BaseModel):
@@ -17,6 +17,10 @@ class FrameworkElementCreate(FrameworkElementBase):
 
 class FrameworkElement(FrameworkElementBase):
     id: int
+    function_id: Optional[int] = None
+    category_id: Optional[int] = None
+    depth: Optional[int] = None
+    path: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -45,6 +49,36 @@ class AssessmentItemUpdate(BaseModel):
     evidence_links: Optional[List[str]] = None
 
 
+class AssessmentItemBulkUpdate(AssessmentItemUpdate):
+    id: int
+
+
+class BulkUpdateResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: str  # "updated" | "invalid" | "not_found"
+    errors: List[Dict[str, Any]] = []
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkUpdateResult]
+
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based record number, header excluded
+    code: Optional[str] = None
+    errors: List[Dict[str, Any]] = []
+
+
+class ImportResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: List[ImportRowError]
+
+
 class AssessmentItem(AssessmentItemBase):
     id: int
     assessment_id: int
@@ -63,8 +97,42 @@ class SecurityAssessmentBase(BaseModel):
     description: str
 
 
+class SecurityAssessmentCreate(SecurityAssessmentBase):
+    description: str = ""
+    framework: Optional[str] = None  # Add an item for every subcategory of this framework
+
+
+class SecurityAssessmentClone(BaseModel):
+    name: Optional[str] = None  # Defaults to the source name plus " (copy)"
+    description: Optional[str] = None
+
+
 class SecurityAssessment(SecurityAssessmentBase):
     id: int
     
     class Config:
         from_attributes = True
+
+
+class CompareGroups(BaseModel):
+    # One entry per function or category, in catalog order
+    code: List[str]
+    title: List[str]
+    total_subcategories: List[int]
+
+
+class CompareSeries(BaseModel):
+    # Metric arrays are aligned with CompareGroups; averages are None
+    # where the assessment has no items in a group
+    id: int
+    name: str
+    avg_current_maturity: List[Optional[float]]
+    avg_target_maturity: List[Optional[float]]
+    item_count: List[int]
+    completed_subcategories: List[int]
+
+
+class CompareResponse(BaseModel):
+    group_by: str  # "function" | "category"
+    groups: CompareGroups
+    assessments: List[CompareSeries]
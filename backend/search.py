@@ -0,0 +1,148 @@
+"""SQLite FTS5 full-text search over framework elements and item notes.
+
+Both indexes are external-content FTS5 tables: they store only the
+token index and read text back from framework_elements and
+assessment_items. Triggers keep them in step with every insert, update
+and delete, including bulk executemany writes.
+"""
+import html
+import re
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+SNIPPET_TOKENS = 12
+
+# Private-use characters FTS5 puts around matches; the snippet text is
+# HTML-escaped before they are turned into SNIPPET_OPEN/SNIPPET_CLOSE
+MATCH_OPEN = "\ue000"
+MATCH_CLOSE = "\ue001"
+
+# bm25 column weights: a hit in the code outranks one in the title,
+# which outranks one in the description
+ELEMENT_WEIGHTS = (10.0, 5.0, 1.0)
+
+# (FTS table, content table, indexed columns)
+SEARCH_INDEXES = [
+    ("framework_elements_fts", "framework_elements", ("code", "title", "description")),
+    ("assessment_items_fts", "assessment_items", ("notes",)),
+]
+
+
+def _index_ddl(fts: str, content: str, columns) -> List[str]:
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});"
+    return [
+        # Prefix indexes keep type-ahead queries ("inv*") to index lookups
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{names}, content='{content}', content_rowid='id', prefix='2 3')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {content} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {content} BEGIN {delete_old} END",
+        # Only writes that set an indexed column re-index the row
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {content} "
+        f"BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def fts5_available(conn) -> bool:
+    options = {row[0] for row in conn.execute(text("PRAGMA compile_options"))}
+    return "ENABLE_FTS5" in options
+
+
+def ensure_search_indexes(conn, tables: set) -> bool:
+    """Create missing FTS tables and triggers, filling them from existing rows.
+
+    Returns False if this SQLite build has no FTS5; search is then
+    unavailable but nothing else is affected.
+    """
+    if not fts5_available(conn):
+        return False
+    for fts, content, columns in SEARCH_INDEXES:
+        if content in tables and fts not in tables:
+            for statement in _index_ddl(fts, content, columns):
+                conn.execute(text(statement))
+    return True
+
+
+def fts_query(q: str) -> Optional[str]:
+    """FTS5 query matching every word of `q` as a prefix.
+
+    Words are quoted, so user input cannot inject FTS syntax; punctuation
+    inside a word becomes a token boundary ("ID.AM" matches the adjacent
+    tokens "id" "am"). None if `q` has no searchable words.
+    """
+    words = [word for word in q.split() if re.search(r"\w", word)]
+    if not words:
+        return None
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def snippet_html(snippet: Optional[str]) -> Optional[str]:
+    """An FTS5 snippet as HTML: the text escaped, the matches in <mark>"""
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(MATCH_OPEN, SNIPPET_OPEN)
+        .replace(MATCH_CLOSE, SNIPPET_CLOSE)
+    )
+
+
+def _result_rows(rows) -> List[dict]:
+    return [{**row._mapping, "snippet": snippet_html(row.snippet)} for row in rows]
+
+
+def search_elements(db: Session, match: str, framework: Optional[str] = None, limit: int = 20):
+    """Current framework elements matching `match`, best bm25 rank first"""
+    weights = ", ".join(str(weight) for weight in ELEMENT_WEIGHTS)
+    return _result_rows(db.execute(text(f"""
+        SELECT e.id, e.code, e.title, e.level, e.framework, e.path,
+               bm25(framework_elements_fts, {weights}) AS score,
+               snippet(framework_elements_fts, -1, :open, :close, '…', :tokens) AS snippet
+        FROM framework_elements_fts
+        JOIN framework_elements AS e ON e.id = framework_elements_fts.rowid
+        WHERE framework_elements_fts MATCH :match
+          AND e.retired = 0
+          AND (:framework IS NULL OR e.framework = :framework)
+        ORDER BY score
+        LIMIT :limit
+    """), {
+        "match": match, "framework": framework, "limit": limit,
+        "open": MATCH_OPEN, "close": MATCH_CLOSE, "tokens": SNIPPET_TOKENS,
+    }))
+
+
+def search_notes(
+    db: Session,
+    match: str,
+    framework: Optional[str] = None,
+    assessment_id: Optional[int] = None,
+    limit: int = 20
+):
+    """Assessment items whose notes match `match`, best bm25 rank first"""
+    return _result_rows(db.execute(text("""
+        SELECT i.id AS item_id, i.assessment_id, e.id AS element_id, e.code, e.title,
+               bm25(assessment_items_fts) AS score,
+               snippet(assessment_items_fts, 0, :open, :close, '…', :tokens) AS snippet
+        FROM assessment_items_fts
+        JOIN assessment_items AS i ON i.id = assessment_items_fts.rowid
+        JOIN framework_elements AS e ON e.id = i.framework_element_id
+        WHERE assessment_items_fts MATCH :match
+          AND e.retired = 0
+          AND (:framework IS NULL OR e.framework = :framework)
+          AND (:assessment_id IS NULL OR i.assessment_id = :assessment_id)
+        ORDER BY score
+        LIMIT :limit
+    """), {
+        "match": match, "framework": framework, "assessment_id": assessment_id, "limit": limit,
+        "open": MATCH_OPEN, "close": MATCH_CLOSE, "tokens": SNIPPET_TOKENS,
+    }))
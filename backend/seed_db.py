@@ -1,157 +1,101 @@
-import json
-from sqlalchemy.orm import Session
+import argparse
+import time
+from sqlalchemy import insert
+from assessments import DEFAULT_ITEM_VALUES
+from catalog_loader import load_catalog, read_catalog
 from database import SessionLocal, engine
+from migrations import migrate
+from history import checkpoint_assessment
+from rollups import ItemChange, apply_item_changes
 import models
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
+migrate(engine, models.Base.metadata)
 
 
-def load_framework(db, file_path, framework_name):
-    """Load a framework from JSON file"""
-    with open(file_path, 'r') as f:
-        framework_data = json.load(f)
-    
-    print(f"\nLoading {framework_name}...")
-    
-    # Create functions
-    functions_map = {}
-    for func_data in framework_data['functions']:
-        func = models.FrameworkElement(
-            code=func_data['code'],
-            title=func_data['title'],
-            description=func_data['description'],
-            level='function',
-            framework=framework_name,
-            parent_id=None
-        )
-        db.add(func)
-        db.flush()
-        functions_map[func.code] = func.id
-        print(f"  ✓ Function: {func.code} - {func.title}")
-    
-    # Create categories
-    categories_map = {}
-    for cat_data in framework_data['categories']:
-        category = models.FrameworkElement(
-            code=cat_data['code'],
-            title=cat_data['title'],
-            description=cat_data['description'],
-            level='category',
-            framework=framework_name,
-            parent_id=functions_map[cat_data['function']]
-        )
-        db.add(category)
+# (catalog file, framework, default assessment name, description)
+CATALOGS = [
+    ('seed_data.json', 'CSF', "CSF 2026 Internal",
+     "Internal NIST CSF 2.0 assessment for 2026"),
+    ('privacy_framework.json', 'Privacy', "Privacy Framework 2026 Internal",
+     "Internal NIST Privacy Framework assessment for 2026"),
+]
+
+
+def load_framework(db, file_path, framework_name, log=print):
+    """Load or refresh a framework from a catalog file (see catalog_loader)"""
+    log(f"\nLoading {framework_name}...")
+    start = time.perf_counter()
+    result = load_catalog(db, framework_name, read_catalog(file_path))
+    elapsed = (time.perf_counter() - start) * 1000
+    if not result.changed:
+        log(f"  ✓ Unchanged ({elapsed:.1f} ms)")
+    else:
+        log(f"  ✓ {result.inserted} inserted, {result.updated} updated, "
+            f"{result.retired} retired ({elapsed:.1f} ms)")
+    return result
+
+
+def create_assessment_items(db, assessment_id, subcategory_ids):
+    """Bulk insert default assessment items for the given subcategories"""
+    if not subcategory_ids:
+        return 0
+    db.execute(insert(models.AssessmentItem), [
+        {
+            **DEFAULT_ITEM_VALUES,
+            'assessment_id': assessment_id,
+            'framework_element_id': subcategory_id,
+        }
+        for subcategory_id in subcategory_ids
+    ])
+    maturity = (DEFAULT_ITEM_VALUES['current_maturity'], DEFAULT_ITEM_VALUES['target_maturity'])
+    apply_item_changes(db, [
+        ItemChange(assessment_id, subcategory_id, None, maturity)
+        for subcategory_id in subcategory_ids
+    ])
+    checkpoint_assessment(db, assessment_id)
+    return len(subcategory_ids)
+
+
+def get_or_create_assessment(db, name, description):
+    assessment = db.query(models.SecurityAssessment).filter(
+        models.SecurityAssessment.name == name
+    ).first()
+    if assessment is None:
+        assessment = models.SecurityAssessment(name=name, description=description)
+        db.add(assessment)
         db.flush()
-        categories_map[cat_data['code']] = category.id
-        print(f"    ✓ Category: {cat_data['code']} - {cat_data['title']}")
-    
-    # Create subcategories
-    subcategory_count = 0
-    for sub_data in framework_data['subcategories']:
-        subcategory = models.FrameworkElement(
-            code=sub_data['code'],
-            title=sub_data['title'],
-            description=sub_data['title'],
-            level='subcategory',
-            framework=framework_name,
-            parent_id=categories_map[sub_data['category']]
-        )
-        db.add(subcategory)
-        subcategory_count += 1
-    
-    db.commit()
-    print(f"  ✓ Created {subcategory_count} subcategories")
-    
-    return {
-        'functions': len(framework_data['functions']),
-        'categories': len(framework_data['categories']),
-        'subcategories': subcategory_count
-    }
+    return assessment
 
 
-def load_seed_data():
+def load_seed_data(quiet=False):
+    """Load or refresh the bundled catalogs; safe to re-run.
+
+    Unchanged catalogs are skipped by content hash. Subcategories new to a
+    catalog get a default item in that framework's default assessment.
+    """
+    log = (lambda *args, **kwargs: None) if quiet else print
+    start = time.perf_counter()
     db = SessionLocal()
     
     try:
-        # Check if data already exists
-        existing = db.query(models.FrameworkElement).first()
-        if existing:
-            print("Data already exists. Skipping seed.")
-            return
-        
-        # Load NIST CSF 2.0
-        csf_stats = load_framework(db, 'seed_data.json', 'CSF')
-        
-        # Load NIST Privacy Framework
-        privacy_stats = load_framework(db, 'privacy_framework.json', 'Privacy')
-        
-        # Create default assessments
-        csf_assessment = models.SecurityAssessment(
-            name="CSF 2026 Internal",
-            description="Internal NIST CSF 2.0 assessment for 2026"
-        )
-        db.add(csf_assessment)
-        
-        privacy_assessment = models.SecurityAssessment(
-            name="Privacy Framework 2026 Internal",
-            description="Internal NIST Privacy Framework assessment for 2026"
-        )
-        db.add(privacy_assessment)
-        db.commit()
-        
-        print(f"\n✓ Created assessments")
-        
-        # Create assessment items for CSF subcategories
-        csf_subcategories = db.query(models.FrameworkElement).filter(
-            models.FrameworkElement.level == 'subcategory',
-            models.FrameworkElement.framework == 'CSF'
-        ).all()
-        
-        for subcategory in csf_subcategories:
-            item = models.AssessmentItem(
-                assessment_id=csf_assessment.id,
-                framework_element_id=subcategory.id,
-                current_maturity=0,
-                target_maturity=3,
-                notes="",
-                evidence_links=[]
-            )
-            db.add(item)
-        
-        # Create assessment items for Privacy subcategories
-        privacy_subcategories = db.query(models.FrameworkElement).filter(
-            models.FrameworkElement.level == 'subcategory',
-            models.FrameworkElement.framework == 'Privacy'
-        ).all()
-        
-        for subcategory in privacy_subcategories:
-            item = models.AssessmentItem(
-                assessment_id=privacy_assessment.id,
-                framework_element_id=subcategory.id,
-                current_maturity=0,
-                target_maturity=3,
-                notes="",
-                evidence_links=[]
-            )
-            db.add(item)
-        
-        db.commit()
-        
-        print(f"✓ Created {len(csf_subcategories)} CSF assessment items")
-        print(f"✓ Created {len(privacy_subcategories)} Privacy assessment items")
+        for file_path, framework_name, assessment_name, description in CATALOGS:
+            result = load_framework(db, file_path, framework_name, log)
+            if result.inserted_leaf_ids:
+                assessment = get_or_create_assessment(db, assessment_name, description)
+                items = create_assessment_items(db, assessment.id, result.inserted_leaf_ids)
+                log(f"  ✓ Created {items} items in {assessment_name!r}")
+            # The catalog and its new items commit together, so a failed
+            # run is retried in full rather than skipped by the hash
+            db.commit()
         
-        print(f"\n{'='*70}")
-        print(f"SUCCESS! Complete frameworks loaded:")
-        print(f"\n  NIST CSF 2.0:")
-        print(f"    • {csf_stats['functions']} Functions")
-        print(f"    • {csf_stats['categories']} Categories")
-        print(f"    • {csf_stats['subcategories']} Subcategories")
-        print(f"\n  NIST Privacy Framework:")
-        print(f"    • {privacy_stats['functions']} Functions")
-        print(f"    • {privacy_stats['categories']} Categories")
-        print(f"    • {privacy_stats['subcategories']} Subcategories")
-        print(f"{'='*70}")
+        log(f"\n{'='*70}")
+        for catalog in db.query(models.FrameworkCatalog).order_by(models.FrameworkCatalog.framework):
+            log(f"  {catalog.framework}: {catalog.element_count} elements "
+                f"(hash {catalog.content_hash[:12]})")
+        log(f"{'='*70}")
+        print(f"Seeded database in {(time.perf_counter() - start) * 1000:.1f} ms")
         
     except Exception as e:
         print(f"Error loading seed data: {e}")
@@ -164,4 +108,7 @@ def load_seed_data():
 
 
 if __name__ == "__main__":
-    load_seed_data()
+    parser = argparse.ArgumentParser(description="Seed the GRC database with framework data")
+    parser.add_argument("--quiet", action="store_true", help="only print the total seeding time")
+    args = parser.parse_args()
+    load_seed_data(quiet=args.quiet)
@@ -0,0 +1,57 @@
+"""Direct JSON encoding for the large read endpoints.
+
+Validating thousands of ORM objects through Pydantic costs more than the
+query that loads them. These helpers select plain column tuples in the
+field order of a response schema and encode them with orjson instead.
+The schema stays the route's documented response_model, and its fields
+define the payload shape, so the two cannot drift apart.
+"""
+from typing import Any, Iterable, List, Sequence, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def schema_fields(schema: Type[BaseModel]) -> List[str]:
+    """Scalar field names of `schema`, in serialization order"""
+    return [
+        name for name, field in schema.model_fields.items()
+        if not (isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel))
+    ]
+
+
+def schema_columns(schema: Type[BaseModel], model: Any) -> list:
+    """Model columns matching the scalar fields of `schema`"""
+    return [getattr(model, name) for name in schema_fields(schema)]
+
+
+def encode_rows(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """JSON array of objects built from rows selected with schema_columns"""
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+def encode_nested_rows(
+    fields: Sequence[str],
+    nested_key: str,
+    nested_fields: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> bytes:
+    """Like encode_rows for rows holding a parent and one joined child.
+
+    Each row is the parent's columns followed by the child's; the child
+    is emitted as an object under `nested_key`.
+    """
+    split = len(fields)
+    return orjson.dumps([
+        {
+            **dict(zip(fields, row[:split])),
+            nested_key: dict(zip(nested_fields, row[split:])),
+        }
+        for row in rows
+    ])
+
+
+def json_response(body: bytes, headers: dict = None) -> Response:
+    """Response for a pre-encoded JSON body"""
+    return Response(content=body, media_type="application/json", headers=headers)
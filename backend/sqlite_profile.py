@@ -0,0 +1,119 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+def sqlite_connect_args(settings) -> dict:
+    """connect_args for SQLite engines shared across FastAPI worker threads"""
+    return {
+        "check_same_thread": False,
+        # pysqlite's own lock wait, in seconds; kept in line with busy_timeout
+        "timeout": settings.sqlite_busy_timeout / 1000,
+    }
+
+
+def apply_sqlite_profile(engine: Engine, settings, read_only: bool = False) -> Engine:
+    """Set the production PRAGMAs on every connection the engine opens"""
+    if engine.dialect.name != "sqlite":
+        return engine
+    
+    pragmas = [
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}",
+    ]
+    if read_only:
+        # The journal mode is a property of the file and is set by the writer
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    
+    # Async engines fire connection events on their sync facade
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    
+    return engine
+
+
+def read_only_url(database_url):
+    """The `mode=ro` URI form of a file-backed SQLite URL, or None if not applicable"""
+    url = make_url(database_url)
+    database = url.database
+    if (
+        url.get_backend_name() != "sqlite"
+        or not database
+        or database == ":memory:"
+        or database.startswith("file:")
+    ):
+        return None
+    return url.set(
+        database=f"file:{database}",
+        query={**url.query, "mode": "ro", "uri": "true"}
+    )
+
+
+def create_write_engine(database_url: str, settings) -> Engine:
+    """Writer engine: a single pooled connection, so writes are serialized in-process"""
+    kwargs = {"connect_args": sqlite_connect_args(settings)}
+    if read_only_url(database_url) is not None:
+        kwargs.update(pool_size=1, max_overflow=0)
+    return apply_sqlite_profile(create_engine(database_url, **kwargs), settings)
+
+
+def create_read_engine(database_url: str, settings, write_engine: Engine) -> Engine:
+    """Read-only engine with its own connection pool.
+
+    Falls back to `write_engine` for databases that cannot be opened
+    read-only by URI (in-memory or non-SQLite URLs).
+    """
+    url = read_only_url(database_url)
+    if url is None:
+        return write_engine
+    engine = create_engine(
+        url,
+        connect_args=sqlite_connect_args(settings),
+        pool_size=settings.sqlite_read_pool_size,
+        max_overflow=settings.sqlite_read_max_overflow,
+    )
+    return apply_sqlite_profile(engine, settings, read_only=True)
+
+
+def async_url(database_url):
+    """The aiosqlite form of a SQLite URL; other URLs are returned unchanged"""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return url
+    return url.set(drivername="sqlite+aiosqlite")
+
+
+def create_async_write_engine(database_url: str, settings) -> AsyncEngine:
+    """aiosqlite counterpart of create_write_engine"""
+    url = async_url(database_url)
+    kwargs = {"connect_args": sqlite_connect_args(settings)}
+    if read_only_url(url) is not None:
+        kwargs.update(poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+    return apply_sqlite_profile(create_async_engine(url, **kwargs), settings)
+
+
+def create_async_read_engine(database_url: str, settings, write_engine: AsyncEngine) -> AsyncEngine:
+    """aiosqlite counterpart of create_read_engine"""
+    url = read_only_url(async_url(database_url))
+    if url is None:
+        return write_engine
+    engine = create_async_engine(
+        url,
+        connect_args=sqlite_connect_args(settings),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.sqlite_read_pool_size,
+        max_overflow=settings.sqlite_read_max_overflow,
+    )
+    return apply_sqlite_profile(engine, settings, read_only=True)
@@ -0,0 +1,60 @@
+from typing import Any, Optional
+
+from sqlalchemy import and_, case, distinct, func, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+
+
+def function_rollup_query(
+    element_model: Any,
+    item_model: Any,
+    assessment_id: int,
+    framework: Optional[str] = None
+) -> Select:
+    """Aggregate assessment items per top-level function in one SQL statement.
+
+    Subcategories are matched to their function through the materialized
+    function_id column, so any hierarchy depth is a single indexed join.
+    Each result row carries function_id, function_code, function_title,
+    total_subcategories, item_count, avg_current, avg_target and completed.
+    Functions without subcategories or items are included with zero
+    counts and NULL averages.
+    """
+    function = aliased(element_model)
+    subcategory = aliased(element_model)
+
+    stmt = (
+        select(
+            function.id.label("function_id"),
+            function.code.label("function_code"),
+            function.title.label("function_title"),
+            func.count(distinct(subcategory.id)).label("total_subcategories"),
+            func.count(item_model.id).label("item_count"),
+            func.avg(item_model.current_maturity).label("avg_current"),
+            func.avg(item_model.target_maturity).label("avg_target"),
+            func.coalesce(
+                func.sum(case((item_model.current_maturity > 0, 1), else_=0)), 0
+            ).label("completed"),
+        )
+        .select_from(function)
+        .outerjoin(
+            subcategory,
+            and_(
+                subcategory.function_id == function.id,
+                subcategory.level == "subcategory"
+            )
+        )
+        .outerjoin(
+            item_model,
+            and_(
+                item_model.framework_element_id == subcategory.id,
+                item_model.assessment_id == assessment_id
+            )
+        )
+        .where(function.level == "function")
+        .group_by(function.id)
+        .order_by(function.id)
+    )
+    if framework is not None:
+        stmt = stmt.where(function.framework == framework)
+    return stmt
@@ -0,0 +1,32 @@
+"""Fixtures running the flat app against a temporary SQLite database.
+
+The app modules read DATABASE_URL when first imported, so tests import
+them inside fixtures and test bodies, after `database_dir` has set it.
+"""
+import contextlib
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def database_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("grc")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path / 'grc.db'}"
+    return path
+
+
+@pytest.fixture(scope="session")
+def client(database_dir):
+    """The flat app on a database seeded with the bundled catalogs"""
+    from fastapi.testclient import TestClient
+    import seed_db
+    # The seeder reads the catalogs from the working directory
+    with contextlib.chdir(BACKEND_DIR):
+        seed_db.load_seed_data(quiet=True)
+    import main
+    return TestClient(main.app)
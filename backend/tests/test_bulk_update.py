@@ -0,0 +1,25 @@
+"""PATCH /assessment-items/bulk"""
+
+
+def summary_etag(client) -> str:
+    # Follows the assessment revision, which every applied update bumps
+    return client.get("/summary?assessment_id=1").headers["etag"]
+
+
+def test_entry_without_fields_is_invalid(client):
+    etag = summary_etag(client)
+    response = client.patch("/assessment-items/bulk", json=[{"id": 1}, {"id": 2, "notes": "bulk"}])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["updated"], body["failed"]) == (1, 1)
+    assert [result["status"] for result in body["results"]] == ["invalid", "updated"]
+    assert body["results"][0]["errors"][0]["type"] == "no_fields"
+    assert client.get("/assessment-items/2").json()["notes"] == "bulk"
+    assert summary_etag(client) != etag
+
+
+def test_only_entries_without_fields_write_nothing(client):
+    etag = summary_etag(client)
+    body = client.patch("/assessment-items/bulk", json=[{"id": 1}]).json()
+    assert (body["updated"], body["failed"]) == (0, 1)
+    assert summary_etag(client) == etag
@@ -0,0 +1,16 @@
+"""GET /assessments/compare"""
+
+
+def test_response_matches_declared_model(client):
+    import schemas
+    response = client.get("/assessments/compare?ids=1,2&group_by=category")
+    assert response.status_code == 200
+    body = schemas.CompareResponse.model_validate_json(response.content)
+    assert [series.id for series in body.assessments] == [1, 2]
+    assert all(len(series.item_count) == len(body.groups.code) for series in body.assessments)
+
+
+def test_openapi_documents_response(client):
+    operation = client.get("/openapi.json").json()["paths"]["/assessments/compare"]["get"]
+    schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema == {"$ref": "#/components/schemas/CompareResponse"}
@@ -0,0 +1,55 @@
+"""Parallel writers and readers on the SQLite connection profile"""
+import random
+import threading
+
+WRITERS = 4
+READERS = 8
+REQUESTS_PER_CLIENT = 25
+
+
+def test_sqlite_profile_is_applied(client):
+    from config import settings
+    from database import engine
+
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.sqlite_busy_timeout
+
+
+def test_concurrent_writers_and_readers_do_not_fail(client):
+    from fastapi.testclient import TestClient
+    import main
+
+    item_ids = [item["id"] for item in client.get("/assessment-items").json()]
+    failures = []
+    lock = threading.Lock()
+
+    def worker(write: bool, seed: int):
+        rng = random.Random(seed)
+        worker_client = TestClient(main.app)
+        for _ in range(REQUESTS_PER_CLIENT):
+            try:
+                if write:
+                    response = worker_client.patch(
+                        f"/assessment-items/{rng.choice(item_ids)}",
+                        json={"current_maturity": rng.randint(0, 5)}
+                    )
+                else:
+                    response = worker_client.get(rng.choice(["/summary", "/assessment-items"]))
+                error = None if response.status_code < 500 else f"{response.status_code} {response.text[:200]}"
+            except Exception as e:  # e.g. OperationalError: database is locked
+                error = repr(e)
+            if error is not None:
+                with lock:
+                    failures.append(error)
+
+    threads = [
+        threading.Thread(target=worker, args=(index < WRITERS, index))
+        for index in range(WRITERS + READERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not any("database is locked" in failure for failure in failures), failures[:5]
+    assert not failures, failures[:5]
@@ -0,0 +1,39 @@
+"""Point-in-time reads of assessment items (as_of)"""
+import time
+
+
+def item_ids(response):
+    return [item["id"] for item in response.json()]
+
+
+def test_paged_as_of_reads_filter_on_past_values(client):
+    from history import utcnow
+    assessment_id = client.post(
+        "/assessments", json={"name": "History paging", "framework": "CSF"}
+    ).json()["id"]
+    ids = item_ids(client.get(f"/assessment-items?assessment_id={assessment_id}"))
+    for position in (10, 40, 80):
+        client.patch(f"/assessment-items/{ids[position]}", json={"current_maturity": 2})
+    time.sleep(0.01)
+    as_of = utcnow().isoformat()
+    time.sleep(0.01)
+    client.patch(f"/assessment-items/{ids[20]}", json={"current_maturity": 2})
+    client.patch(f"/assessment-items/{ids[10]}", json={"current_maturity": 0})
+
+    url = f"/assessment-items?assessment_id={assessment_id}&as_of={as_of}&min_maturity=1"
+    assert item_ids(client.get(url)) == [ids[10], ids[40], ids[80]]
+    first = client.get(url + "&limit=2")
+    assert item_ids(first) == [ids[10], ids[40]]
+    assert "rel=\"next\"" in first.headers["link"]
+    assert item_ids(client.get(url + f"&limit=2&after={ids[40]}")) == [ids[80]]
+    current = client.get(f"/assessment-items?assessment_id={assessment_id}&min_maturity=1")
+    assert item_ids(current) == [ids[20], ids[40], ids[80]]
+
+
+def test_items_as_of_reads_only_requested_items(client):
+    import database
+    from history import items_as_of, utcnow
+    with database.SessionLocal() as db:
+        state = items_as_of(db, 1, utcnow())
+        some = sorted(state)[5:8]
+        assert items_as_of(db, 1, utcnow(), some) == {item_id: state[item_id] for item_id in some}
@@ -0,0 +1,50 @@
+"""POST /assessments/{id}/import"""
+import orjson
+
+
+def privacy_code() -> str:
+    from sqlalchemy import select
+    import database
+    import models
+    with database.SessionLocal() as db:
+        return db.execute(
+            select(models.FrameworkElement.code).where(
+                models.FrameworkElement.framework == "Privacy",
+                models.FrameworkElement.level == "subcategory"
+            ).limit(1)
+        ).scalar_one()
+
+
+def upload(client, assessment_id, records, **params):
+    content = b"".join(orjson.dumps(record) + b"\n" for record in records)
+    return client.post(
+        f"/assessments/{assessment_id}/import",
+        params=params,
+        files={"file": ("items.ndjson", content, "application/x-ndjson")}
+    )
+
+
+def test_codes_of_other_frameworks_need_framework(client):
+    assessment_id = client.post(
+        "/assessments", json={"name": "Import scope", "framework": "CSF"}
+    ).json()["id"]
+    code = privacy_code()
+
+    body = upload(client, assessment_id, [{"code": code, "notes": "imported"}]).json()
+    assert (body["created"], body["failed"]) == (0, 1)
+    assert body["errors"][0]["errors"][0]["type"] == "not_found"
+
+    body = upload(client, assessment_id, [{"code": code, "notes": "imported"}], framework="Privacy").json()
+    assert (body["created"], body["failed"]) == (1, 0)
+
+
+def test_created_items_get_the_seeded_defaults(client):
+    from assessments import DEFAULT_ITEM_VALUES
+    assessment_id = client.post("/assessments", json={"name": "Import defaults"}).json()["id"]
+
+    body = upload(client, assessment_id, [{"code": privacy_code(), "notes": "imported"}], framework="Privacy").json()
+    assert body["created"] == 1
+    item, = client.get(f"/assessment-items?assessment_id={assessment_id}").json()
+    assert item["current_maturity"] == DEFAULT_ITEM_VALUES["current_maturity"]
+    assert item["target_maturity"] == DEFAULT_ITEM_VALUES["target_maturity"]
+    assert item["notes"] == "imported"
@@ -0,0 +1,46 @@
+"""SQL statistics recorded by metrics for the request being served"""
+import contextlib
+
+import pytest
+
+
+@contextlib.contextmanager
+def request_stats():
+    import metrics
+    stats = metrics.QueryStats()
+    token = metrics._current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        metrics._current_stats.reset(token)
+
+
+def test_rows_fetched_and_affected_are_counted(client):
+    from sqlalchemy import select, update
+    import database
+    import models
+    item = models.AssessmentItem
+    with database.SessionLocal() as db, request_stats() as stats:
+        ids = db.execute(select(item.id).where(item.assessment_id == 1).limit(7)).scalars().all()
+        assert (stats.queries, stats.rows) == (1, 7)
+        db.execute(update(item).where(item.id.in_(ids[:3])).values(notes=item.notes))
+        assert (stats.queries, stats.rows) == (2, 10)
+        db.rollback()
+
+
+def test_failed_statement_leaves_no_start_time(client):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    import database
+    with database.SessionLocal() as db, request_stats() as stats:
+        info = db.connection().info
+        with pytest.raises(OperationalError):
+            db.execute(text("SELECT * FROM no_such_table"))
+        assert not info.get("query_start")
+        assert stats.queries == 0
+
+
+def test_metrics_middleware_is_outermost(client):
+    import main
+    from metrics import MetricsMiddleware
+    assert main.app.user_middleware[0].cls is MetricsMiddleware
@@ -0,0 +1,69 @@
+"""Read endpoints are served from indexes; element codes are unique per framework"""
+import re
+
+import pytest
+
+from benchmarks.explain_queries import ENDPOINTS
+
+# FTS5 MATCH lookups are reported as scans of the virtual table's index
+FTS_LOOKUP = re.compile(r"VIRTUAL TABLE INDEX \d+:")
+CTE_NAME = re.compile(r"(?:\bWITH(?: RECURSIVE)?|,)\s+(\w+)(?:\([^)]*\))?\s+AS\s+\(")
+SCANNED = re.compile(r"\bSCAN (?!CONSTANT ROW)(\w+)")
+
+
+def is_table_scan(detail: str, statement: str) -> bool:
+    """Whether a plan line reads a whole table; scanning a CTE's own rows is fine"""
+    match = SCANNED.search(detail)
+    if match is None or FTS_LOOKUP.search(detail):
+        return False
+    return match.group(1) not in CTE_NAME.findall(statement)
+
+
+def query_plan(engine, statement, parameters):
+    raw = engine.raw_connection()
+    try:
+        rows = raw.cursor().execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    finally:
+        raw.close()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_read_endpoint_does_not_scan(client, url):
+    from benchmarks.explain_queries import capture_statements
+    from database import read_engine
+
+    statements = capture_statements(client, read_engine, url)
+    assert statements
+    scans = [
+        (" ".join(statement.split())[:90], detail)
+        for statement, parameters in statements
+        for detail in query_plan(read_engine, statement, parameters)
+        if is_table_scan(detail, statement)
+    ]
+    assert not scans
+
+
+def test_element_codes_are_unique_per_framework(client):
+    from sqlalchemy import delete
+    from sqlalchemy.exc import IntegrityError
+    import models
+    from database import SessionLocal
+
+    def element(framework):
+        return models.FrameworkElement(
+            code="UNIQ-01", title="Duplicate code", level="function", framework=framework
+        )
+
+    with SessionLocal() as db:
+        # The same code in two frameworks is accepted
+        db.add_all([element("UNIQ-A"), element("UNIQ-B")])
+        db.commit()
+        try:
+            db.add(element("UNIQ-A"))
+            with pytest.raises(IntegrityError):
+                db.commit()
+            db.rollback()
+        finally:
+            db.execute(delete(models.FrameworkElement).where(models.FrameworkElement.code == "UNIQ-01"))
+            db.commit()
@@ -0,0 +1,41 @@
+"""GET /search"""
+import re
+
+import pytest
+
+NOTE = '<img src=x onerror=alert(1)> access control & "quotes" </mark><script>'
+TITLE = "Asset <b>inventories</b> are maintained"
+
+# Any tag other than the snippet markers
+FOREIGN_TAG = re.compile(r"<(?!/?mark>)")
+
+
+@pytest.fixture
+def html_content(client):
+    """Item notes and an element title holding HTML, restored afterwards"""
+    from sqlalchemy import select, update
+    import database
+    import models
+    element = models.FrameworkElement
+    client.patch("/assessment-items/1", json={"notes": NOTE}).raise_for_status()
+    with database.SessionLocal() as db:
+        title = db.execute(select(element.title).where(element.code == "ID.AM-01")).scalar_one()
+        db.execute(update(element).where(element.code == "ID.AM-01").values(title=TITLE))
+        db.commit()
+    yield
+    with database.SessionLocal() as db:
+        db.execute(update(element).where(element.code == "ID.AM-01").values(title=title))
+        db.commit()
+
+
+@pytest.mark.parametrize("kind, q, expected", [
+    ("notes", "control", "access <mark>control</mark>"),
+    ("notes", "onerror", "&lt;img src=x <mark>onerror</mark>=alert(1)&gt;"),
+    ("elements", "inventories", "&lt;b&gt;<mark>inventories</mark>&lt;/b&gt;"),
+])
+def test_snippets_escape_stored_text(client, html_content, kind, q, expected):
+    response = client.get("/search", params={"q": q})
+    assert response.status_code == 200
+    snippets = [result["snippet"] for result in response.json()[kind]]
+    assert any(expected in snippet for snippet in snippets)
+    assert not [snippet for snippet in snippets if FOREIGN_TAG.search(snippet)]
@@ -0,0 +1,75 @@
+"""GET /summary runs a fixed number of SQL statements however many functions there are"""
+import contextlib
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+FUNCTION_COUNTS = (1, 5, 25)
+
+
+@contextlib.contextmanager
+def count_statements():
+    """Collect every statement any engine executes in the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+def add_framework(db, framework: str, functions: int) -> int:
+    """A framework of `functions` functions, each with one category of two
+    subcategories, and an assessment of it; returns the assessment id"""
+    import models
+
+    for f in range(functions):
+        function = models.FrameworkElement(
+            code=f"{framework}-F{f}", title=f"Function {f}", level="function", framework=framework
+        )
+        db.add(function)
+        db.flush()
+        category = models.FrameworkElement(
+            code=f"{framework}-F{f}.C", title="Category", level="category",
+            framework=framework, parent_id=function.id
+        )
+        db.add(category)
+        db.flush()
+        for s in range(2):
+            db.add(models.FrameworkElement(
+                code=f"{framework}-F{f}.C-{s}", title=f"Subcategory {s}", level="subcategory",
+                framework=framework, parent_id=category.id
+            ))
+    assessment = models.SecurityAssessment(name=framework)
+    db.add(assessment)
+    db.commit()
+    return assessment.id
+
+
+def test_summary_statement_count_is_fixed(client):
+    from database import SessionLocal
+
+    client.get("/summary")
+    counts = {"all": {}, "framework": {}}
+    for functions in FUNCTION_COUNTS:
+        # Each catalog adds functions to the unfiltered summary too
+        framework = f"SUM{functions}"
+        with SessionLocal() as db:
+            assessment_id = add_framework(db, framework, functions)
+        for key, url in (
+            ("all", f"/summary?assessment_id={assessment_id}"),
+            ("framework", f"/summary?assessment_id={assessment_id}&framework={framework}"),
+        ):
+            with count_statements() as statements:
+                response = client.get(url)
+            assert response.status_code == 200
+            if key == "framework":
+                assert len(response.json()["summary"]) == functions
+            counts[key][functions] = len(statements)
+    for key, by_functions in counts.items():
+        assert by_functions[FUNCTION_COUNTS[0]] > 0
+        assert len(set(by_functions.values())) == 1, f"{key}: statements per function count {by_functions}"
@@ -0,0 +1,34 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def index_by_parent(elements: Iterable[Any]) -> Dict[Optional[int], List[Any]]:
+    """Group elements by parent_id in a single pass, preserving input order"""
+    children = defaultdict(list)
+    for element in elements:
+        children[element.parent_id].append(element)
+    return children
+
+
+def build_tree(
+    elements: Iterable[Any],
+    serialize: Callable[[Any], dict],
+    root_id: Optional[int] = None
+) -> List[dict]:
+    """Build hierarchical tree structure in O(n).
+
+    `serialize` turns one element into a node dict; a `children` list is
+    added to every node. Elements whose parent is not part of the tree
+    (and is not `root_id`) are dropped, matching the old recursive builder.
+    """
+    children_of = index_by_parent(elements)
+    roots: List[dict] = []
+    stack = [(root_id, roots)]
+    while stack:
+        parent_id, siblings = stack.pop()
+        for element in children_of.get(parent_id, ()):
+            node = serialize(element)
+            node["children"] = []
+            siblings.append(node)
+            stack.append((element.id, node["children"]))
+    return roots
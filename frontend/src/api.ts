@@ -1,5 +1,17 @@
 import axios from 'axios';
-import type { FrameworkElement, AssessmentItem, AssessmentItemUpdate, SummaryResponse } from './types';
+import type {
+  FrameworkElement,
+  AssessmentItem,
+  AssessmentItemUpdate,
+  AssessmentItemBulkUpdate,
+  BulkUpdateResponse,
+  AssessmentComparison,
+  SecurityAssessment,
+  SecurityAssessmentCreate,
+  SecurityAssessmentClone,
+  SearchResponse,
+  SummaryResponse
+} from './types';
 
 const API_BASE = '/api';
 
@@ -12,6 +24,44 @@ export const api = {
     return response.data;
   },
 
+  // Assessments
+  getAssessments: async (): Promise<SecurityAssessment[]> => {
+    const response = await axios.get(`${API_BASE}/assessments`);
+    return response.data;
+  },
+
+  createAssessment: async (data: SecurityAssessmentCreate): Promise<SecurityAssessment> => {
+    const response = await axios.post(`${API_BASE}/assessments`, data);
+    return response.data;
+  },
+
+  cloneAssessment: async (
+    assessmentId: number,
+    data: SecurityAssessmentClone = {}
+  ): Promise<SecurityAssessment> => {
+    const response = await axios.post(`${API_BASE}/assessments/${assessmentId}/clone`, data);
+    return response.data;
+  },
+
+  compareAssessments: async (
+    assessmentIds: number[],
+    groupBy: 'function' | 'category' = 'function'
+  ): Promise<AssessmentComparison> => {
+    const response = await axios.get(`${API_BASE}/assessments/compare`, {
+      params: { ids: assessmentIds.join(','), group_by: groupBy }
+    });
+    return response.data;
+  },
+
+  // Full-text search
+  search: async (
+    q: string,
+    params: { framework?: string; assessment_id?: number; limit?: number } = {}
+  ): Promise<SearchResponse> => {
+    const response = await axios.get(`${API_BASE}/search`, { params: { q, ...params } });
+    return response.data;
+  },
+
   // Assessment items
   getAssessmentItems: async (assessmentId: number = 1): Promise<AssessmentItem[]> => {
     const response = await axios.get(`${API_BASE}/assessment-items`, {
@@ -33,6 +83,13 @@ export const api = {
     return response.data;
   },
 
+  bulkUpdateAssessmentItems: async (
+    updates: AssessmentItemBulkUpdate[]
+  ): Promise<BulkUpdateResponse> => {
+    const response = await axios.patch(`${API_BASE}/assessment-items/bulk`, updates);
+    return response.data;
+  },
+
   // Summary
   getSummary: async (assessmentId: number = 1): Promise<SummaryResponse> => {
     const response = await axios.get(`${API_BASE}/summary`, {
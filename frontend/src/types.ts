@@ -9,6 +9,42 @@ export interface FrameworkElement {
   children?: FrameworkElement[];
 }
 
+export interface SecurityAssessment {
+  id: number;
+  name: string;
+  description: string;
+}
+
+export interface SecurityAssessmentCreate {
+  name: string;
+  description?: string;
+  framework?: string;
+}
+
+export interface SecurityAssessmentClone {
+  name?: string;
+  description?: string;
+}
+
+export interface AssessmentSeries {
+  id: number;
+  name: string;
+  avg_current_maturity: (number | null)[];
+  avg_target_maturity: (number | null)[];
+  item_count: number[];
+  completed_subcategories: number[];
+}
+
+export interface AssessmentComparison {
+  group_by: 'function' | 'category';
+  groups: {
+    code: string[];
+    title: string[];
+    total_subcategories: number[];
+  };
+  assessments: AssessmentSeries[];
+}
+
 export interface AssessmentItem {
   id: number;
   assessment_id: number;
@@ -27,6 +63,23 @@ export interface AssessmentItemUpdate {
   evidence_links?: string[];
 }
 
+export interface AssessmentItemBulkUpdate extends AssessmentItemUpdate {
+  id: number;
+}
+
+export interface BulkUpdateResult {
+  index: number;
+  id: number | null;
+  status: 'updated' | 'invalid' | 'not_found';
+  errors: { loc: (string | number)[]; msg: string; type: string }[];
+}
+
+export interface BulkUpdateResponse {
+  updated: number;
+  failed: number;
+  results: BulkUpdateResult[];
+}
+
 export interface FunctionSummary {
   function_code: string;
   function_name: string;
@@ -40,3 +93,30 @@ export interface SummaryResponse {
   assessment_id: number;
   summary: FunctionSummary[];
 }
+
+export interface ElementSearchHit {
+  id: number;
+  code: string;
+  title: string;
+  level: string;
+  framework: string;
+  path: string;
+  score: number;
+  snippet: string;
+}
+
+export interface NoteSearchHit {
+  item_id: number;
+  assessment_id: number;
+  element_id: number;
+  code: string;
+  title: string;
+  score: number;
+  snippet: string;
+}
+
+export interface SearchResponse {
+  query: string;
+  elements: ElementSearchHit[];
+  notes: NoteSearchHit[];
+}